@@ -12,6 +12,7 @@ load_dotenv()
 from src.config import Config
 from src.agents import DataCollector, DataAnalyzer, ReportGenerator
 from src.memory import Memory
+from src.tools import configure_upstream_limits, configure_tool_cache
 from src.utils import setup_logger
 from src.utils import get_logger
 get_logger().set_agent_context('runner', 'main')
@@ -25,6 +26,10 @@ async def run_report(resume: bool = True):
         config_file_path='my_config.yaml',
         config_dict={}
     )
+    # Per-source limits for blocking data-source calls made by the tools
+    configure_upstream_limits(config.config.get('tool_concurrency'))
+    # Reuse tool results (statements, macro series, prices) across runs while they are fresh
+    configure_tool_cache(config.config.get('tool_cache'))
     collect_tasks = config.config['custom_collect_tasks']
     analysis_tasks = config.config['custom_analysis_tasks']
     
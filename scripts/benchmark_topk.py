@@ -0,0 +1,47 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.vector_index import top_k_indices
+
+
+def best_time(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmark full argsort vs partial top-k selection.")
+    parser.add_argument("--rows", type=str, default="100000,1000000,5000000")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'rows':>10} {'argsort_ms':>12} {'top_k_ms':>10} {'speedup':>8}")
+    for rows in (int(r) for r in args.rows.split(",")):
+        # Cosine similarities are float32 in [-1, 1]; quantize a little so ties actually occur.
+        sims = np.round(rng.uniform(-1.0, 1.0, size=rows), 4).astype(np.float32)
+        full = best_time(lambda: np.argsort(sims)[::-1][: args.top_k], args.repeats)
+        partial = best_time(lambda: top_k_indices(sims, args.top_k), args.repeats)
+
+        expected = np.lexsort((np.arange(rows), -sims))[: args.top_k]
+        if not np.array_equal(top_k_indices(sims, args.top_k), expected):
+            raise AssertionError(f"top_k_indices disagrees with a stable full sort at rows={rows}")
+        print(f"{rows:>10} {full * 1e3:>12.2f} {partial * 1e3:>10.2f} {full / partial:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
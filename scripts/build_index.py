@@ -1,8 +1,10 @@
-import json
+import argparse
+import itertools
 import sys
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List
 
+import numpy as np
 import yaml
 from dotenv import load_dotenv
 
@@ -11,7 +13,17 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from src.core.embeddings import EmbeddingClient
-from src.core.vector_index import VectorIndex, chunk_text
+from src.core.ivf_index import IVFIndex
+from src.core.quantized_index import STORAGE_FORMATS, QuantizedIndex
+from src.core.vector_index import (
+    IndexWriter,
+    VectorIndex,
+    chunk_hash,
+    chunk_text,
+    remove_derived_files,
+    write_index_manifest,
+)
+from src.tools.pdf_ingest import iter_pages
 
 
 def load_config() -> Dict[str, Any]:
@@ -19,42 +31,157 @@ def load_config() -> Dict[str, Any]:
         return yaml.safe_load(f)
 
 
+def iter_chunks(
+    pages: Iterable[Dict[str, Any]],
+    chunk_size: int,
+    chunk_overlap: int,
+    model_id: str,
+    drop_missing_sources: bool,
+    stats: Dict[str, int],
+) -> Iterator[Dict[str, Any]]:
+    for page in pages:
+        # Incremental runs also drop pages whose PDF was deleted since the pages were parsed.
+        if drop_missing_sources and page.get("source_path") and not Path(page["source_path"]).exists():
+            stats["dropped_pages"] += 1
+            continue
+        for content in chunk_text(page.get("text", ""), chunk_size=chunk_size, chunk_overlap=chunk_overlap):
+            yield {
+                "source_file": page["source_file"],
+                "source_path": page["source_path"],
+                "page": page["page"],
+                "content": content,
+                "chunk_hash": chunk_hash(content, model_id, chunk_size, chunk_overlap),
+            }
+
+
+def batched(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, max(1, size))):
+        yield batch
+
+
 def main() -> None:
     load_dotenv(PROJECT_ROOT / ".env")
     config = load_config()
-    parsed_file = Path(config["paths"]["parsed_dir"]) / "pages.json"
-    if not parsed_file.exists():
-        raise FileNotFoundError("Missing parsed pages. Run scripts/ingest_pdfs.py first.")
-
-    with parsed_file.open("r", encoding="utf-8") as f:
-        pages: List[Dict[str, Any]] = json.load(f)
-
+    parser = argparse.ArgumentParser(description="Chunk parsed pages, embed them and save the vector index.")
+    parser.add_argument(
+        "--index-type",
+        choices=["flat", "ivf"],
+        default=config["artifacts"].get("index_type", "flat"),
+        help="flat: exact brute-force search; ivf: k-means inverted lists searched with nprobe",
+    )
+    parser.add_argument(
+        "--nlist",
+        type=int,
+        default=int(config["artifacts"].get("ivf_nlist", 0)),
+        help="Number of IVF lists (0 = about 4 * sqrt(chunks))",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=["float32", *STORAGE_FORMATS],
+        default=config["artifacts"].get("index_storage", "float32"),
+        help="Vector storage for flat indexes: float32 (raw), float16, int8 (per-dim scalar) or pq",
+    )
+    parser.add_argument(
+        "--keep-raw",
+        action="store_true",
+        help="Also keep raw embeddings.npy next to compressed codes, enabling exact re-ranking",
+    )
+    parser.add_argument("--pq-subvectors", type=int, default=0, help="PQ sub-quantizers (0 = dim // 8)")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=bool(config["artifacts"].get("incremental_build", False)),
+        help="Reuse vectors of unchanged chunks from the existing index and embed only new chunks",
+    )
+    parser.add_argument(
+        "--embed-batch",
+        type=int,
+        default=1024,
+        help="Chunks read, embedded and written per streaming step (bounds memory)",
+    )
+    args = parser.parse_args()
+    if args.index_type == "ivf" and args.storage != "float32":
+        raise ValueError("Compressed storage is only supported for flat indexes; use --storage float32 with ivf.")
+    parsed_dir = Path(config["paths"]["parsed_dir"])
     chunk_size = int(config["artifacts"]["chunk_size"])
     chunk_overlap = int(config["artifacts"]["chunk_overlap"])
-    metadata: List[Dict[str, Any]] = []
-    texts: List[str] = []
-    for page in pages:
-        chunks = chunk_text(page.get("text", ""), chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-        for content in chunks:
-            metadata.append(
-                {
-                    "source_file": page["source_file"],
-                    "source_path": page["source_path"],
-                    "page": page["page"],
-                    "content": content,
-                }
-            )
-            texts.append(content)
-
-    if not texts:
-        raise ValueError("No extractable text chunks found. OCR may be required.")
-
-    embedder = EmbeddingClient()
-    embeddings = embedder.embed_texts(texts)
-
-    index = VectorIndex(Path(config["artifacts"]["rag_index_dir"]))
-    index.save(metadata, embeddings)
-    print(f"Saved chunks: {len(metadata)}")
+    # Chunk hashes record embedder.model_id(), so a silent fallback to another provider would
+    # mislabel the stored vectors; fail the build instead.
+    embedder = EmbeddingClient(fallback=False)
+    stats = {"dropped_pages": 0, "reused": 0, "embedded": 0, "duplicates": 0}
+    chunks = iter_chunks(
+        iter_pages(parsed_dir),
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        model_id=embedder.model_id(),
+        drop_missing_sources=args.incremental,
+        stats=stats,
+    )
+
+    index_dir = Path(config["artifacts"]["rag_index_dir"])
+    reuse_rows, previous = VectorIndex(index_dir).reusable_vectors() if args.incremental else ({}, None)
+    # Output row of the first chunk with each hash; repeated text (disclaimers, headers) is embedded once.
+    seen: Dict[str, int] = {}
+    writer = IndexWriter(VectorIndex(index_dir))
+    try:
+        for batch in batched(chunks, args.embed_batch):
+            duplicate_of: List[int] = []
+            sources: List[Any] = []
+            pending: List[str] = []
+            for item in batch:
+                h = item["chunk_hash"]
+                if h in seen:
+                    duplicate_of.append(seen[h])
+                    stats["duplicates"] += 1
+                    continue
+                seen[h] = writer.rows + len(duplicate_of)
+                duplicate_of.append(-1)
+                if h in reuse_rows:
+                    sources.append(reuse_rows[h])
+                else:
+                    sources.append(None)
+                    pending.append(item["content"])
+            fresh = iter(embedder.embed_texts(pending)) if pending else iter(())
+            vectors = [next(fresh) if src is None else previous[src] for src in sources]
+            stats["embedded"] += len(pending)
+            stats["reused"] += len(sources) - len(pending)
+            writer.add(batch, np.asarray(vectors, dtype=np.float32) if vectors else None, duplicate_of)
+        if writer.rows == 0:
+            raise ValueError("No extractable text chunks found. OCR may be required.")
+        n_chunks = writer.close()
+    except Exception:
+        writer.abort()
+        raise
+    # Release the memory map of the previous build; its file has been replaced.
+    del previous
+    # IVF lists, codes and the manifest of the previous build describe the old embeddings.npy; drop
+    # them before anything else so a failed step below never leaves a mismatched index behind.
+    remove_derived_files(index_dir)
+
+    embeddings = np.load(index_dir / "embeddings.npy", mmap_mode="r")
+    if args.index_type == "ivf":
+        IVFIndex(index_dir).train(embeddings, nlist=args.nlist or None)
+    elif args.storage != "float32":
+        QuantizedIndex(index_dir).encode(
+            embeddings,
+            storage=args.storage,
+            keep_raw=args.keep_raw,
+            pq_subvectors=args.pq_subvectors or None,
+        )
+    del embeddings
+    # Written last: RetrieverAgent opens the index this manifest describes.
+    write_index_manifest(index_dir, args.index_type, args.storage)
+
+    if args.incremental:
+        if not reuse_rows:
+            print("No reusable vectors in the existing index; embedded every chunk.")
+        print(f"Reused chunks: {stats['reused']}")
+        print(f"Embedded chunks: {stats['embedded']}")
+        print(f"Dropped pages with missing PDFs: {stats['dropped_pages']}")
+    print(f"Duplicate chunks sharing a vector: {stats['duplicates']}")
+    print(f"Saved chunks: {n_chunks}")
+    print(f"Index type: {args.index_type} ({args.storage})")
     print(f"Saved index: {config['artifacts']['rag_index_dir']}")
 
 
@@ -0,0 +1,83 @@
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.ivf_index import IVFIndex
+from src.core.vector_index import VectorIndex
+
+
+def synthetic_embeddings(rows: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    # Clustered data is closer to real document embeddings than isotropic noise.
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=rows)
+    return centers[labels] + 0.6 * rng.standard_normal((rows, dim)).astype(np.float32)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recall vs latency of IVF search against exact search.")
+    parser.add_argument("--index-dir", type=str, default="", help="Existing index dir (default: config rag_index_dir)")
+    parser.add_argument("--synthetic", type=int, default=0, help="Evaluate on N synthetic rows instead")
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--nlist", type=int, default=0)
+    parser.add_argument("--nprobe", type=str, default="1,2,4,8,16,32")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    # Synthetic indexes and freshly trained IVF lists live here; an existing index dir is only read.
+    tmp_dir = tempfile.TemporaryDirectory()
+    if args.synthetic:
+        index_dir = Path(tmp_dir.name)
+        embeddings = synthetic_embeddings(args.synthetic, args.dim, max(8, args.synthetic // 500), rng)
+        VectorIndex(index_dir).save([{} for _ in range(args.synthetic)], embeddings)
+    else:
+        if args.index_dir:
+            index_dir = Path(args.index_dir)
+        else:
+            with (PROJECT_ROOT / "config" / "project_config.yaml").open("r", encoding="utf-8") as f:
+                index_dir = Path(yaml.safe_load(f)["artifacts"]["rag_index_dir"])
+        _, embeddings = VectorIndex(index_dir).load()
+
+    # Queries are perturbed copies of indexed rows, like paraphrased questions about known passages.
+    picks = rng.choice(embeddings.shape[0], size=min(args.queries, embeddings.shape[0]), replace=False)
+    queries = embeddings[picks] + 0.3 * np.std(embeddings) * rng.standard_normal(embeddings[picks].shape)
+
+    exact = VectorIndex(index_dir)
+    exact.ensure_loaded()
+    start = time.perf_counter()
+    truth = [exact.query(q, args.top_k)[0] for q in queries]
+    exact_ms = (time.perf_counter() - start) * 1e3 / len(queries)
+
+    ivf = IVFIndex(index_dir)
+    start = time.perf_counter()
+    if not ivf.ivf_file.exists() or args.synthetic or args.nlist:
+        # Train into the scratch dir so the served index (and its index.json) is left untouched.
+        ivf.ivf_file = Path(tmp_dir.name) / "eval_ivf.npz"
+        ivf.train(embeddings, nlist=args.nlist or None, seed=args.seed)
+    ivf.ensure_loaded()
+    print(f"rows={embeddings.shape[0]} nlist={ivf._centroids.shape[0]} setup={time.perf_counter() - start:.2f}s")
+    print(f"{'nprobe':>8} {'recall@k':>9} {'ms/query':>9} {'speedup':>8}")
+    print(f"{'exact':>8} {1.0:>9.3f} {exact_ms:>9.3f} {1.0:>7.1f}x")
+    for nprobe in (int(n) for n in args.nprobe.split(",")):
+        start = time.perf_counter()
+        found = [ivf.query(q, args.top_k, nprobe=nprobe)[0] for q in queries]
+        ivf_ms = (time.perf_counter() - start) * 1e3 / len(queries)
+        recall = np.mean([np.intersect1d(t, f).size / max(1, t.size) for t, f in zip(truth, found)])
+        print(f"{nprobe:>8} {recall:>9.3f} {ivf_ms:>9.3f} {exact_ms / ivf_ms:>7.1f}x")
+
+    tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
 import argparse
 import json
+import os
 import shutil
 import sys
+import time
+import itertools
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Deque, Dict, Iterator, List, Tuple
 
 import yaml
 from dotenv import load_dotenv
@@ -12,7 +17,8 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from src.tools.pdf_ingest import extract_pdf_pages, scan_pdf_files
+from src.core.jsonl_store import JsonlWriter
+from src.tools.pdf_ingest import LEGACY_PAGES_FILE, PAGES_FILE, count_pdf_pages, extract_pdf_task, scan_pdf_files
 
 
 def parse_bool(value: str) -> bool:
@@ -24,11 +30,62 @@ def load_config() -> Dict[str, Any]:
         return yaml.safe_load(f)
 
 
+def plan_tasks(files: List[Path], page_counts: List[int], pages_per_task: int) -> List[Tuple[int, int, int]]:
+    """Split every file into (file_index, first_page, last_page) ranges of at most pages_per_task pages."""
+    tasks: List[Tuple[int, int, int]] = []
+    for file_idx, n_pages in enumerate(page_counts):
+        for first in range(1, n_pages + 1, pages_per_task):
+            tasks.append((file_idx, first, min(first + pages_per_task - 1, n_pages)))
+    return tasks
+
+
+def extract_serial(files: List[Path]) -> Iterator[Tuple[int, List[Dict[str, Any]], float]]:
+    for file_idx, path in enumerate(files):
+        pages, elapsed = extract_pdf_task(path, 1, None)
+        yield file_idx, pages, elapsed
+
+
+def extract_parallel(
+    files: List[Path], workers: int, pages_per_task: int
+) -> Iterator[Tuple[int, List[Dict[str, Any]], float]]:
+    """
+    Extract all files across a process pool; large files are split into page ranges.
+
+    Yields (file_index, pages, seconds) in (file order, first page) order, so the output is identical
+    to a serial run. At most workers * 4 tasks are in flight, which bounds memory held by results
+    that finished ahead of a slow predecessor.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        page_counts = list(pool.map(count_pdf_pages, files, chunksize=8))
+        tasks = iter(plan_tasks(files, page_counts, pages_per_task))
+        window: Deque[Tuple[int, Future]] = deque()
+        for file_idx, first, last in itertools.islice(tasks, workers * 4):
+            window.append((file_idx, pool.submit(extract_pdf_task, files[file_idx], first, last)))
+        while window:
+            file_idx, future = window.popleft()
+            for next_idx, first, last in itertools.islice(tasks, 1):
+                window.append((next_idx, pool.submit(extract_pdf_task, files[next_idx], first, last)))
+            pages, elapsed = future.result()
+            yield file_idx, pages, elapsed
+
+
 def main() -> None:
     load_dotenv(PROJECT_ROOT / ".env")
     parser = argparse.ArgumentParser(description="Ingest PDFs into local project data.")
     parser.add_argument("--source-dir", type=str, required=True, help="Directory to scan for PDFs")
     parser.add_argument("--recursive", type=str, default="true", help="true/false")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Extraction processes (1 = serial, in-process)",
+    )
+    parser.add_argument(
+        "--pages-per-task",
+        type=int,
+        default=100,
+        help="Split larger PDFs into page ranges of this size so one file can use several workers",
+    )
     args = parser.parse_args()
 
     config = load_config()
@@ -45,22 +102,44 @@ def main() -> None:
     if not pdf_files:
         raise FileNotFoundError(f"No PDF files found under: {src_dir}")
 
-    all_pages: List[Dict[str, Any]] = []
+    targets: List[Path] = []
     for pdf in pdf_files:
         target = raw_dir / pdf.name
         if not target.exists():
             shutil.copy2(pdf, target)
-        pages = extract_pdf_pages(target)
-        all_pages.extend(pages)
-
-    with (parsed_dir / "pages.json").open("w", encoding="utf-8") as f:
-        json.dump(all_pages, f, ensure_ascii=False, indent=2)
+        targets.append(target)
+
+    started = time.perf_counter()
+    if args.workers <= 1:
+        results = extract_serial(targets)
+    else:
+        results = extract_parallel(targets, args.workers, max(1, args.pages_per_task))
+
+    # Pages are streamed to disk as each file (range) finishes; nothing accumulates in memory.
+    timings = [{"source_file": t.name, "pages": 0, "tasks": 0, "seconds": 0.0} for t in targets]
+    ocr_needed = 0
+    with JsonlWriter(parsed_dir / PAGES_FILE) as writer:
+        for file_idx, pages, elapsed in results:
+            writer.write_all(pages)
+            ocr_needed += sum(1 for p in pages if p["ocr_required"])
+            timings[file_idx]["pages"] += len(pages)
+            timings[file_idx]["tasks"] += 1
+            timings[file_idx]["seconds"] = round(timings[file_idx]["seconds"] + elapsed, 3)
+    total_pages = writer.count
+    elapsed = time.perf_counter() - started
+    # Drop the pre-JSONL pages.json so it cannot be mistaken for current output.
+    (parsed_dir / LEGACY_PAGES_FILE).unlink(missing_ok=True)
+    with (parsed_dir / "ingest_timings.json").open("w", encoding="utf-8") as f:
+        json.dump(timings, f, ensure_ascii=False, indent=2)
 
-    ocr_needed = sum(1 for p in all_pages if p["ocr_required"])
     print(f"Ingested PDFs: {len(pdf_files)}")
-    print(f"Extracted pages: {len(all_pages)}")
+    print(f"Extracted pages: {total_pages}")
     print(f"Pages flagged OCR-required: {ocr_needed}")
-    print(f"Output: {parsed_dir / 'pages.json'}")
+    print(f"Extraction time: {elapsed:.1f}s with {max(1, args.workers)} worker(s)")
+    for item in sorted(timings, key=lambda t: t["seconds"], reverse=True)[:5]:
+        print(f"  {item['seconds']:>8.2f}s  {item['pages']:>5} pages  {item['source_file']}")
+    print(f"Output: {parsed_dir / PAGES_FILE}")
+    print(f"Per-file timings: {parsed_dir / 'ingest_timings.json'}")
 
 
 if __name__ == "__main__":
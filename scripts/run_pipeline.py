@@ -15,12 +15,21 @@ from src.core.report_pipeline import ReportPipeline
 def main() -> None:
     load_dotenv(PROJECT_ROOT / ".env")
     parser = argparse.ArgumentParser(description="Run integrated report pipeline.")
-    parser.add_argument("--question", type=str, required=True)
+    parser.add_argument(
+        "--question",
+        type=str,
+        action="append",
+        required=True,
+        help="Repeat to answer several questions with one batched retrieval pass",
+    )
     parser.add_argument("--top-k", type=int, default=0)
     args = parser.parse_args()
 
     pipeline = ReportPipeline(PROJECT_ROOT / "config" / "project_config.yaml")
-    result = pipeline.run(args.question, top_k=args.top_k or None)
+    if len(args.question) == 1:
+        result = pipeline.run(args.question[0], top_k=args.top_k or None)
+    else:
+        result = pipeline.run_many(args.question, top_k=args.top_k or None)
     print(json.dumps(result, ensure_ascii=False, indent=2))
 
 
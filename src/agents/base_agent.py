@@ -10,7 +10,8 @@ import asyncio
 from datetime import datetime
 from src.config import Config
 from src.tools import list_tools, get_tool_by_name
-from src.utils import AsyncCodeExecutor, get_logger
+from src.utils import create_code_executor, get_logger
+from src.utils.code_executor_async import get_caller_loop
 from src.tools.base import Tool
 
 
@@ -58,7 +59,7 @@ class BaseAgent:
         if self.enable_code:
             self.executor_path = os.path.join(self.working_dir, '.executor_cache')
             os.makedirs(self.executor_path, exist_ok=True)
-            self.code_executor = AsyncCodeExecutor(self.executor_path)
+            self.code_executor = self._create_code_executor(self.executor_path)
             self.executor_state_path = os.path.join(self.executor_path, 'state.dill')
         
         self.use_llm_name = use_llm_name
@@ -80,6 +81,18 @@ class BaseAgent:
         self.logger = get_logger()
         self.logger.set_agent_context(self.id, self.AGENT_NAME)
     
+    def _create_code_executor(self, executor_path: str):
+        """Build the code executor selected by config (backend, warm pool size and execution budgets)."""
+        cfg = self.config.config
+        return create_code_executor(
+            executor_path,
+            cfg.get('executor_backend', 'thread'),
+            pool_size=cfg.get('executor_pool_size'),
+            timeout=cfg.get('executor_timeout'),
+            cpu_seconds=cfg.get('executor_cpu_seconds'),
+            memory_mb=cfg.get('executor_memory_mb'),
+        )
+
     def _set_default_tools(self):
         return []
 
@@ -377,21 +390,64 @@ class BaseAgent:
                     exec_state = ef.read()
                 self.code_executor.load_state(exec_state)
                 # Ensure helper functions are re-registered
-                self.code_executor.set_variable("call_tool", self._agent_tool_function)
+                self._register_tool_helpers()
             except Exception as e:
                 self.logger.error(f"Failed to load code-executor state: {e}", exc_info=True)
         return state
 
     async def _prepare_executor(self):
         if self.enable_code:
-            self.code_executor.set_variable("call_tool", self._agent_tool_function)
+            self._register_tool_helpers()
+
+    def _register_tool_helpers(self):
+        """Expose call_tool, acall_tool and call_tools_parallel to executor code."""
+        self.code_executor.set_variable("call_tool", self._agent_tool_function)
+        self.code_executor.set_variable("acall_tool", self._acall_tool)
+        self.code_executor.set_variable("call_tools_parallel", self._call_tools_parallel)
 
     async def _prepare_init_prompt(self, input_data: dict) -> list[dict]:
         raise NotImplementedError
     
 
+    def _run_on_agent_loop(self, coro):
+        """
+        Run a coroutine from executor code and wait for its result.
+
+        Inside an execution the coroutine is submitted to the event loop that started it, so tool
+        calls reuse that loop's HTTP sessions and calls from other threads can overlap. Outside an
+        execution (no loop anywhere) it falls back to asyncio.run.
+        """
+        loop = get_caller_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if loop is not None and loop.is_running() and loop is not running:
+            return asyncio.run_coroutine_threadsafe(coro, loop).result()
+        if running is None:
+            return asyncio.run(coro)
+        coro.close()
+        raise RuntimeError("Blocking tool calls cannot run inside async code; use `await acall_tool(...)` instead.")
+
     def _agent_tool_function(self, tool_name: str, **kwargs):
         """Execute a tool by name."""
+        return self._run_on_agent_loop(self._acall_tool(tool_name, **kwargs))
+
+    def _call_tools_parallel(self, calls: list) -> list:
+        """
+        Execute several tool calls concurrently and return their results in order.
+        Each call is a dict with a "tool_name" key plus the tool's keyword arguments, or a
+        (tool_name, kwargs) pair.
+        """
+        async def run_all():
+            return await asyncio.gather(*(
+                self._acall_tool(**call) if isinstance(call, dict) else self._acall_tool(call[0], **call[1])
+                for call in calls
+            ))
+        return self._run_on_agent_loop(run_all())
+
+    async def _acall_tool(self, tool_name: str, **kwargs):
+        """Execute a tool by name (awaitable version of call_tool)."""
         target_tool = None
         for tool in self.tools:
             if isinstance(tool, Tool):
@@ -411,12 +467,12 @@ class BaseAgent:
             if issubclass(type(target_tool), BaseAgent):
                 if 'task' not in kwargs:
                     kwargs['task'] = self.current_task_data['task']
-                response = asyncio.run(target_tool.async_run(input_data=kwargs))
+                response = await target_tool.async_run(input_data=kwargs)
                 response = response['final_result']
                 self.memory.add_log(target_tool.id, target_tool.type, kwargs, response, error=False, note=f"Tool {target_tool.name} executed successfully")
                 return response
             elif issubclass(type(target_tool), Tool):
-                response = asyncio.run(target_tool.api_function(**kwargs))
+                response = await target_tool.fetch(**kwargs)
                 response = [item.data for item in response]
                 self.memory.add_log(target_tool.id, target_tool.type, kwargs, response, error=False, note=f"Tool {target_tool.name} executed successfully")
                 return response
@@ -620,6 +676,8 @@ class BaseAgent:
                     feedback.append(f"  - {var_name}: {var_info}")
         else:
             feedback.append("Code execution: failed\n")
+            if result.get("budget_exceeded"):
+                feedback.append(f"Execution budget exceeded: {result['budget_exceeded']}\n")
             if result["stderr"]:
                 feedback.append(f"Error message: {result['stderr']}\n")
             if result["stdout"]:
@@ -3,13 +3,13 @@ import re
 import json
 import json_repair
 import dill
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 import asyncio
-from threading import Semaphore
+import copy
 from src.agents.base_agent import BaseAgent
 from src.agents import DeepSearchAgent
 from src.tools import ToolResult
-from src.utils import IndexBuilder
+from src.utils import IndexBuilder, ProcessCodeExecutor
 from src.utils import image_to_base64
 
 # TODO: Break parameter passing into explicit arguments
@@ -60,6 +60,8 @@ class DataAnalyzer(BaseAgent):
         self.vlm = self.config.llm_dict[use_vlm_name]
         self.use_embedding_name = use_embedding_name
         self.current_phase = 'phase1'
+        # Set on chart workers when chart code must not run concurrently (see _draw_chart)
+        self.chart_exec_lock: Optional[asyncio.Lock] = None
  
         self.image_save_dir = os.path.join(self.working_dir, "images")
         os.makedirs(self.image_save_dir, exist_ok = True)
@@ -82,7 +84,7 @@ class DataAnalyzer(BaseAgent):
             return collect_data_list[data_id].data
         def _get_deepsearch_result(query: str):
             ds_agent = tool_list[0]
-            output =  asyncio.run(ds_agent.async_run(input_data={
+            output = self._run_on_agent_loop(ds_agent.async_run(input_data={
                 'task': current_task_data['task'],
                 'query': query
             }))
@@ -239,7 +241,6 @@ class DataAnalyzer(BaseAgent):
         name_description_mapping = {}  # long chart name -> description
         chart_code_mapping = {}  # long chart name -> code snippet
         
-        # Concurrency control semaphore
         charts_completed = set()
         # Load chart-stage checkpoint if available
         charts_ckpt = await self.load(checkpoint_name='charts.pkl')
@@ -250,53 +251,79 @@ class DataAnalyzer(BaseAgent):
             name_description_mapping.update(charts_state.get('name_description_mapping', {}))
             chart_code_mapping.update(charts_state.get('chart_code_mapping', {}))
 
-        for long_chart_name in chart_names:
-            if long_chart_name in charts_completed:
-                continue
-            # TODO: Shared environments need isolation; temporarily limit concurrency to 1
-            with Semaphore(1):
-                new_chart_code, new_chart_name = await self._draw_single_chart(
-                    task = analysis_task,
-                    report_content = report_content,
-                    chart_name = long_chart_name,
-                    current_variables = current_variables, 
-                    max_iterations = max_iterations
-                )
-                name_mapping[long_chart_name] = new_chart_name
-                chart_code_mapping[long_chart_name] = new_chart_code
-                charts_completed.add(long_chart_name)
-                # Save progress after each completed chart (chart-specific checkpoint)
+        # Charts are drawn concurrently, each in its own fork of the analysis namespace. Only the
+        # process backend isolates matplotlib too: in-process executors share pyplot's global current
+        # figure (and pyplot is not thread-safe), so there only the chart code itself runs one at a
+        # time; the LLM code-generation and VLM critique rounds still overlap.
+        concurrency = max(1, int(self.config.config.get('chart_concurrency', 3)))
+        semaphore = asyncio.Semaphore(concurrency)
+        chart_exec_lock = None if isinstance(self.code_executor, ProcessCodeExecutor) else asyncio.Lock()
+        save_lock = asyncio.Lock()
+
+        async def save_charts_state():
+            async with save_lock:
                 await self.save(
                     state={
                         'charts_state': {
                             'completed': list(charts_completed),
-                            'name_mapping': name_mapping,
-                            'name_description_mapping': name_description_mapping,
-                            'chart_code_mapping': chart_code_mapping,
+                            'name_mapping': dict(name_mapping),
+                            'name_description_mapping': dict(name_description_mapping),
+                            'chart_code_mapping': dict(chart_code_mapping),
                         }
                     },
                     checkpoint_name='charts.pkl',
                 )
-        
-        for long_chart_name, new_chart_name in name_mapping.items():
-            chart_des = await self._generate_description(new_chart_name)
+
+        async def draw(long_chart_name):
+            async with semaphore:
+                worker = self._make_chart_worker()
+                worker.chart_exec_lock = chart_exec_lock
+                try:
+                    new_chart_code, new_chart_name = await worker._draw_single_chart(
+                        task = analysis_task,
+                        report_content = report_content,
+                        chart_name = long_chart_name,
+                        current_variables = current_variables, 
+                        max_iterations = max_iterations
+                    )
+                finally:
+                    close = getattr(worker.code_executor, 'close', None)
+                    if close is not None:
+                        close()
+            name_mapping[long_chart_name] = new_chart_name
+            chart_code_mapping[long_chart_name] = new_chart_code
+            charts_completed.add(long_chart_name)
+            # Save progress after each completed chart (chart-specific checkpoint)
+            await save_charts_state()
+
+        pending = [name for name in dict.fromkeys(chart_names) if name not in charts_completed]
+        results = await asyncio.gather(*(draw(name) for name in pending), return_exceptions=True)
+        # Finished charts are already checkpointed; re-raise the first failure once all have settled
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        async def describe(long_chart_name, new_chart_name):
+            async with semaphore:
+                chart_des = await self._generate_description(new_chart_name)
             name_description_mapping[long_chart_name] = chart_des
             # Persist updated description mapping
-            await self.save(
-                state={
-                    'charts_state': {
-                        'completed': list(charts_completed),
-                        'name_mapping': name_mapping,
-                        'name_description_mapping': name_description_mapping,
-                        'chart_code_mapping': chart_code_mapping,
-                    }
-                },
-                checkpoint_name='charts.pkl',
-            )
+            await save_charts_state()
+
+        await asyncio.gather(*(describe(long_name, short_name) for long_name, short_name in list(name_mapping.items())))
 
         return chart_code_mapping, name_mapping, name_description_mapping
     
     
+    def _make_chart_worker(self) -> 'DataAnalyzer':
+        """
+        Shallow copy of this agent for drawing one chart, with a forked code-executor namespace so
+        concurrent charts cannot overwrite each other's variables or the analysis state.
+        """
+        worker = copy.copy(self)
+        worker.code_executor = self.code_executor.fork()
+        return worker
+
     async def _generate_description(self, chart_name: str) -> str:
         chart_name_path = os.path.join(self.image_save_dir, chart_name)
         image_b64 = image_to_base64(chart_name_path)
@@ -414,7 +441,11 @@ class DataAnalyzer(BaseAgent):
                 conversation_history.append({"role": "user", "content": "Your reply did not include a valid <execute> code block. Please provide Python code that draws the chart."})
                 continue  # retry
 
-            code_result = await self.code_executor.execute(code=action_content)
+            if self.chart_exec_lock is not None:
+                async with self.chart_exec_lock:
+                    code_result = await self.code_executor.execute(code=action_content)
+            else:
+                code_result = await self.code_executor.execute(code=action_content)
             self.logger.info(f"code_result: {code_result}")
             if code_result['error']:
                 conversation_history.append({"role": "assistant", "content": llm_response})
@@ -62,7 +62,7 @@ class DataCollector(BaseAgent):
 
     async def _prepare_executor(self):
         # Expose helper functions to the code executor for LLM-generated code
-        self.code_executor.set_variable("call_tool", self._agent_tool_function)
+        self._register_tool_helpers()
         self.code_executor.set_variable("save_result", self._save_result)
 
     def _save_result(self, var: Any, result_name: str, result_description: str, data_source: str):
@@ -10,7 +10,7 @@ from src.agents.base_agent import BaseAgent
 from src.agents import DeepSearchAgent
 from src.tools import ToolResult, get_tool_categories, get_tool_by_name
 from src.agents.report_generator.report_class import Report, Section
-from src.utils.helper import extract_markdown, get_md_img
+from src.utils.helper import extract_markdown, get_md_img, greedy_assignment
 from src.utils.index_builder import IndexBuilder
 from src.utils.figure_helper import draw_kline_chart
 class ReportGenerator(BaseAgent):
@@ -73,10 +73,13 @@ class ReportGenerator(BaseAgent):
         self.use_embedding_name = use_embedding_name
         # Phase checkpoints: outline → sections → post_process
         self._phase: str = 'outline'
-        # Section-level progress counter
+        # Section-level progress: length of the finished prefix, and every finished section index
         self._section_index_done: int = 0
+        self._sections_done: set = set()
         # Post-process sub-stages: 0-image, 1-abstract/title, 2-cover, 3-reference, 4-render
         self._post_stage: int = 0
+        # Checkpoint of the deep-search tool; section workers get their own
+        self.search_checkpoint_name: str = 'deepsearch_latest.pkl'
         
 
     def _set_default_tools(self):
@@ -117,10 +120,10 @@ class ReportGenerator(BaseAgent):
         def _get_deepsearch_result(query: str):
             """Call deep search agent"""
             ds_agent = tool_list[0]
-            output = asyncio.run(ds_agent.async_run(input_data={
+            output = self._run_on_agent_loop(ds_agent.async_run(input_data={
                 'task': current_task_data.get('task', ''),
                 'query': query
-            }))
+            }, checkpoint_name=self.search_checkpoint_name))
             return output['final_result']
         
         self.code_executor.set_variable("get_data", _get_data)
@@ -178,7 +181,7 @@ class ReportGenerator(BaseAgent):
             }]
 
     async def _handle_search_action(self, action_content: str):
-        search_result = await self.tools[0].async_run(input_data={'query': action_content})
+        search_result = await self.tools[0].async_run(input_data={'query': action_content}, checkpoint_name=self.search_checkpoint_name)
         return {
             'action': 'search',
             'action_content': action_content,
@@ -271,45 +274,39 @@ class ReportGenerator(BaseAgent):
         if len(img_captions) == 0:
             self.logger.warning("No image captions found, skip image path replacement")
             return report
-        self.logger.info(f"Building index for {len(img_captions)} images")
+        # Collect every placeholder first so all charts are matched in one pass
+        placeholders = []  # (section, paragraph index, placeholder text)
+        for section in report.sections:
+            for p_idx, p_paragraph in enumerate(section._content or []):
+                match = re.findall(r'@import.*', p_paragraph, flags=re.DOTALL)
+                self.logger.debug(f"Section image placeholders: {len(match)}")
+                placeholders.extend((section, p_idx, img_name) for img_name in match)
+        if not placeholders:
+            return report
+
+        self.logger.info(f"Matching {len(placeholders)} placeholders against {len(img_captions)} images")
         index = IndexBuilder(config=self.config, embedding_model=self.use_embedding_name, working_dir=self.working_dir)
-        await index._build_index(img_captions)
+        try:
+            vectors = await index.embed_texts([img_name for _, _, img_name in placeholders] + img_captions)
+        finally:
+            index.close()
+        placeholder_vectors, caption_vectors = vectors[:len(placeholders)], vectors[len(placeholders):]
+        similarity = placeholder_vectors @ caption_vectors.T
+        assignment = dict(greedy_assignment(similarity))
+        if len(placeholders) > len(assignment):
+            self.logger.warning("Available images are exhausted; removing unmatched placeholders.")
 
-        used_img_list = []
+        # Figures are numbered in document order
         figure_idx = 1
-        for section in report.sections:
-            section_new_content = []
-            for p_paragraph in section._content:
-                match = re.findall(r'@import.*', p_paragraph,flags=re.DOTALL)
-                try:
-                    self.logger.debug(f"Section image placeholders: {len(match)}")
-                except Exception:
-                    pass
-                if match and len(match) > 0:
-                    for img_name in match:
-                        # img_name is the short placeholder string
-                        most_similar_idx = (await index.search(img_name))[0]['id']
-                        detect_img_name = img_captions[most_similar_idx]
-                        detect_img_path = img_paths[most_similar_idx]
-                        
-                        if len(img_captions) == 1:
-                            # No images left to map
-                            self.logger.warning("Available images are exhausted; stop replacing images.")
-                            # directly delete the image placeholder
-                            p_paragraph = p_paragraph.replace(img_name, "")
-                            continue
-                        del img_captions[most_similar_idx]
-                        del img_paths[most_similar_idx]
-                        # Rebuild the index after consuming this caption
-                        await index._build_index(img_captions)
-
-                        new_string = get_md_img(detect_img_path, remove_suffix(os.path.basename(detect_img_path)), figure_idx)
-                        figure_idx += 1
-                        used_img_list.append(detect_img_name)
-                        p_paragraph = p_paragraph.replace(img_name, new_string)
-
-                section_new_content.append(p_paragraph)
-            section._content = section_new_content
+        for ph_idx, (section, p_idx, img_name) in enumerate(placeholders):
+            img_idx = assignment.get(ph_idx)
+            if img_idx is None:
+                new_string = ""
+            else:
+                img_path = img_paths[img_idx]
+                new_string = get_md_img(img_path, remove_suffix(os.path.basename(img_path)), figure_idx)
+                figure_idx += 1
+            section._content[p_idx] = section._content[p_idx].replace(img_name, new_string)
         return report
 
     
@@ -423,69 +420,70 @@ class ReportGenerator(BaseAgent):
         """
         collect_data_list = self.memory.get_collect_data() # only use data, without analysis result
         all_data = []
+        seen_content = set()
         for item in collect_data_list:
             # TODO: directly set these keys in ToolResult
             name = item.name + '\n' + item.description # used for index
             content = item.source # used for display citation
             # content = item.name + '\n' + item.link  # used for display citation
-            if content not in [ii['content'] for ii in all_data]:
+            if content not in seen_content:
+                seen_content.add(content)
                 all_data.append({
                     'name': name,
                     'content': content 
                 })
         self.logger.info(f"Total data for reference: {len(all_data)}")
-        
-        total_corpus = [item['name'] for item in all_data]
-        index = IndexBuilder(config=self.config, embedding_model=self.use_embedding_name, working_dir=self.working_dir)
-        await index._build_index(total_corpus)
+        source_pattern = r'\[[Ss]ource[：:]\s*(.*?)\]'
+        if not all_data:
+            # Nothing to cite: drop the placeholders so no raw [Source: ...] markers reach the report
+            self.logger.warning("No data available for references, removing citation placeholders")
+            for section in report.sections:
+                if section._content:
+                    section._content = [re.sub(r'[ \t]*' + source_pattern, '', p_paragraph) for p_paragraph in section._content]
+            return report
 
-        total_cited_dict = {}
+        # Collect every citation placeholder in the report, then resolve them all in one pass
+        queries = []
         for section in report.sections:
-            # Optional: log section length
+            for p_paragraph in section._content or []:
+                queries.extend(re.findall(source_pattern, p_paragraph))
+        queries = list(dict.fromkeys(queries))
+        self.logger.debug(f"Citation placeholders: {len(queries)}")
+
+        cite_lists = {}
+        if queries:
+            total_corpus = [item['name'] for item in all_data]
+            index = IndexBuilder(config=self.config, embedding_model=self.use_embedding_name, working_dir=self.working_dir)
             try:
-                self.logger.debug(f"Processing section, content length={len(section.content)}")
-            except Exception:
-                pass
-            section_new_content = []
-            for p_paragraph in section._content:
-                content = p_paragraph
-                print(content)
-                # Locate citation placeholders
-                match_list = re.findall(r'\[[Ss]ource[：:]\s*(.*?)\]',content)
-                self.logger.debug(f"Match list: {match_list}")
-                for match_item in match_list:
-                    # Use BM25/embedding search
-                    search_result = await index.search(match_item, top_k=5)
-                    score_list = [item['score'] for item in search_result]
-                    id_list = [item['id'] for item in search_result]  # Get actual data indices
-                    self.logger.debug(f"Score list: {score_list}")
-                    self.logger.debug(f"ID list: {id_list}")
-                    print(search_result)
-                    # Sort by score (descending) and get corresponding indices
-                    sorted_idx = np.argsort(score_list)[::-1]
-                    score_list = np.array(score_list)
-                    score_list = np.exp(score_list) / np.sum(np.exp(score_list))
-
-                    cite_list = []
-                    for pos in sorted_idx:
-                        pos = int(pos)
-                        actual_idx = id_list[pos]  # Get the actual data index
-                        if score_list[pos] > 0.2 and len(cite_list) < 5:
-                            cite_list.append(actual_idx)
-                    if len(cite_list) == 0:
-                        # If no item meets threshold, use the top result
-                        cite_list.append(id_list[sorted_idx[0]])
-                    new_cite_list = []
-                    for idx in cite_list:
-                        if idx not in total_cited_dict:
-                            total_cited_dict[idx] = len(total_cited_dict) + 1
-                    new_cite_list = [total_cited_dict[idx] for idx in cite_list]
-                    # Build the regex for replacement
-                    pattern_to_replace = r'\[[Ss]ource[：:]\s*' + re.escape(match_item) + r'\]'
-                    content = re.sub(pattern_to_replace, f'[{",".join([str(item) for item in new_cite_list])}]', content)
-
-                section_new_content.append(content)
-            section._content = section_new_content
+                vectors = await index.embed_texts(queries + total_corpus, batch_size=64)
+            finally:
+                index.close()
+            scores = np.nan_to_num(vectors[:len(queries)] @ vectors[len(queries):].T, nan=-np.inf)
+            # Top-5 candidates per placeholder (best first, ties to the lower index)
+            top_ids = np.argsort(-scores, axis=1, kind='stable')[:, :5]
+            top_scores = np.take_along_axis(scores, top_ids, axis=1)
+            # Softmax over each placeholder's top-5 scores; cite every candidate above 0.2,
+            # or the best candidate when none is confident enough
+            probs = np.exp(top_scores - top_scores[:, :1])
+            probs /= probs.sum(axis=1, keepdims=True)
+            keep = probs > 0.2
+            keep[:, 0] |= ~keep.any(axis=1)
+            for query, ids, mask in zip(queries, top_ids, keep):
+                cite_lists[query] = [int(idx) for idx in ids[mask]]
+
+        # Number sources in order of first citation
+        total_cited_dict = {}
+        def replace_citation(match):
+            new_cite_list = []
+            for idx in cite_lists[match.group(1)]:
+                if idx not in total_cited_dict:
+                    total_cited_dict[idx] = len(total_cited_dict) + 1
+                new_cite_list.append(total_cited_dict[idx])
+            return f'[{",".join([str(item) for item in new_cite_list])}]'
+
+        for section in report.sections:
+            if section._content:
+                section._content = [re.sub(source_pattern, replace_citation, p_paragraph) for p_paragraph in section._content]
 
 
         reference_str = "## Reference Data Sources\n\n"
@@ -624,6 +622,7 @@ class ReportGenerator(BaseAgent):
         return {
             'phase': getattr(self, '_phase', 'outline'),
             'section_index': getattr(self, '_section_index_done', 0),
+            'sections_done': sorted(getattr(self, '_sections_done', set())),
             'post_stage': getattr(self, '_post_stage', 0),
         }
 
@@ -645,6 +644,13 @@ class ReportGenerator(BaseAgent):
             except Exception:
                 pass
         
+        # Older checkpoints only record how many leading sections are finished
+        sections_done = extra.get('sections_done') or state.get('sections_done')
+        if sections_done is not None:
+            self._sections_done = {int(idx) for idx in sections_done}
+        else:
+            self._sections_done = set(range(self._section_index_done))
+        
         post_stage = extra.get('post_stage') or state.get('post_stage')
         if post_stage is not None:
             try:
@@ -737,6 +743,191 @@ class ReportGenerator(BaseAgent):
 
 
 
+    def _section_dependencies(self, report) -> Dict[int, List[int]]:
+        """
+        Read declared section dependencies from config.
+
+        `section_dependencies` maps a section number to the numbers of the sections it builds on,
+        e.g. {5: [2, 3]}, numbered from 1 as in the logs. Only earlier sections can be depended on,
+        so the schedule can never deadlock.
+        """
+        declared = self.config.config.get('section_dependencies') or {}
+        dependencies = {}
+        for section_no, required in declared.items():
+            idx = int(section_no) - 1
+            if not 0 <= idx < len(report.sections):
+                self.logger.warning(f"[Phase1] Ignoring dependencies of unknown section {section_no}")
+                continue
+            if isinstance(required, (int, str)):
+                required = [required]
+            deps = []
+            for dep_no in required:
+                dep_idx = int(dep_no) - 1
+                if 0 <= dep_idx < idx:
+                    deps.append(dep_idx)
+                else:
+                    self.logger.warning(f"[Phase1] Section {section_no} can only depend on earlier sections, ignoring {dep_no}")
+            dependencies[idx] = deps
+        return dependencies
+
+    def _make_section_worker(self, idx: int) -> 'ReportGenerator':
+        """
+        Shallow copy of this agent that drafts one section.
+
+        The copy shares config, memory and LLM, but has its own conversation state, checkpoint
+        buffer, code-executor namespace and deep-search agent (with its own checkpoint and link
+        tracking), so sections can run concurrently.
+        """
+        worker = copy.copy(self)
+        worker.state = None
+        worker.current_checkpoint = {}
+        worker.current_task_data = {}
+        worker._resume_state = None
+        worker.tools = [self._make_search_worker(tool) if isinstance(tool, DeepSearchAgent) else tool for tool in self.tools]
+        worker.search_checkpoint_name = f'deepsearch_section_{idx}.pkl'
+        if self.enable_code:
+            worker.executor_path = os.path.join(self.executor_path, f'section_{idx}')
+            os.makedirs(worker.executor_path, exist_ok=True)
+            worker.code_executor = self._create_code_executor(worker.executor_path)
+            worker.executor_state_path = os.path.join(worker.executor_path, 'state.dill')
+        return worker
+
+    def _clear_section_checkpoints(self):
+        """
+        Delete the per-section checkpoints of an earlier outline (section runs, their deep-search runs
+        and executor states), which would otherwise be resumed for different sections.
+        """
+        stale = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir) if re.fullmatch(r'section_\d+\.pkl', name)
+        ]
+        for tool in self.tools:
+            if isinstance(tool, DeepSearchAgent) and os.path.isdir(tool.cache_dir):
+                stale.extend(
+                    os.path.join(tool.cache_dir, name)
+                    for name in os.listdir(tool.cache_dir) if re.fullmatch(r'deepsearch_section_\d+\.pkl', name)
+                )
+        if self.enable_code and os.path.isdir(self.executor_path):
+            stale.extend(
+                os.path.join(self.executor_path, name, 'state.dill')
+                for name in os.listdir(self.executor_path) if re.fullmatch(r'section_\d+', name)
+            )
+        for path in stale:
+            if os.path.exists(path):
+                os.remove(path)
+        if stale:
+            self.logger.info(f"[Phase0] Removed {len(stale)} section checkpoints from a previous outline")
+
+    @staticmethod
+    def _make_search_worker(search_agent: DeepSearchAgent) -> DeepSearchAgent:
+        """Shallow copy of the deep-search agent with its own run state and link tracking."""
+        worker = copy.copy(search_agent)
+        worker.state = None
+        worker.current_checkpoint = {}
+        worker.current_task_data = {}
+        worker.link2name = {}
+        worker.valid_links = {}
+        worker.used_sources = {}
+        return worker
+
+    async def _generate_sections(
+        self,
+        report,
+        input_data: dict,
+        max_iterations: int = 10,
+        stop_words: list[str] = [],
+        echo=False,
+        resume: bool = True,
+        checkpoint_name: str = 'report_latest.pkl',
+    ):
+        """
+        Draft and polish all unfinished sections, up to `section_concurrency` at a time.
+
+        A section starts once the sections it depends on are finished. Every section keeps its own
+        checkpoint (section_{idx}.pkl), and the report checkpoint records the set of finished
+        sections, so a resumed run only redoes the sections that were not finished.
+        """
+        total = len(report.sections)
+        concurrency = max(1, int(self.config.config.get('section_concurrency', 4)))
+        dependencies = self._section_dependencies(report)
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks: Dict[int, asyncio.Task] = {}
+        pending = [idx for idx in range(total) if idx not in self._sections_done]
+        self.logger.info(f"[Phase1] {len(pending)}/{total} sections to generate, concurrency={concurrency}")
+
+        async def run_section(idx: int, section):
+            waiting_on = [tasks[dep] for dep in dependencies.get(idx, []) if dep in tasks]
+            if waiting_on:
+                await asyncio.gather(*waiting_on)
+            async with semaphore:
+                section_input_data = input_data.copy()
+                section_input_data['section_outline'] = section.outline
+                finished_deps = [report.sections[dep] for dep in dependencies.get(idx, [])]
+                if finished_deps:
+                    section_input_data['section_outline'] += "\n\nRelated sections already written:\n\n" + "\n\n".join(
+                        dep.content for dep in finished_deps
+                    )
+                self.logger.info(f"[Phase1] Section {idx+1}/{total} start")
+                worker = self._make_section_worker(idx)
+                try:
+                    # Each section run has its own checkpoint for resume support
+                    section_result = await super(ReportGenerator, worker).async_run(
+                        input_data=section_input_data,
+                        max_iterations=max_iterations,
+                        stop_words=stop_words,
+                        echo=echo,
+                        resume=resume,
+                        checkpoint_name=f'section_{idx}.pkl'
+                    )
+                    draft_section = section_result['final_result']
+                    self.logger.debug(f"[Phase1] Draft section length={len(draft_section)}")
+
+                    # Final polish for the section content
+                    final_section = await worker._final_polish(section_input_data, draft_section)
+                    self.logger.debug(f"[Phase1] Final section length={len(final_section)}")
+                finally:
+                    # The section's own executor (a pooled worker process on the process backend)
+                    if worker.enable_code:
+                        close = getattr(worker.code_executor, 'close', None)
+                        if close is not None:
+                            close()
+            self.memory.add_log(
+                id=self.id,
+                type=self.type,
+                input_data=section_input_data,
+                output_data=section_result,
+                error=False,
+                note=f"Report generator executed successfully"
+            )
+            section.set_content(final_section)
+            self._sections_done.add(idx)
+            while self._section_index_done in self._sections_done:
+                self._section_index_done += 1
+            # Save global progress after each section to resume later
+            await self.save(
+                state={
+                    'phase': 'sections',
+                    'section_index': self._section_index_done,
+                    'sections_done': sorted(self._sections_done),
+                    'report_obj': report,
+                    'input_data': input_data,
+                },
+                checkpoint_name=checkpoint_name,
+            )
+            self.memory.save()
+            self.logger.info(f"[Phase1] Section {idx+1} done, checkpoint saved ({len(self._sections_done)}/{total} finished)")
+
+        for idx in pending:
+            tasks[idx] = asyncio.create_task(run_section(idx, report.sections[idx]))
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        # Finished sections are already checkpointed; surface the first failure so a rerun resumes the rest
+        for idx, result in zip(tasks, results):
+            if isinstance(result, BaseException):
+                self.logger.error(f"[Phase1] Section {idx+1} failed: {result}")
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
     async def async_run(
         self, 
         input_data: dict, 
@@ -758,7 +949,6 @@ class ReportGenerator(BaseAgent):
         """
         # Initialize/restore stage state
         report = None
-        start_index = 0
         self.enable_chart = enable_chart
         input_data['max_iterations'] = max_iterations
         
@@ -792,8 +982,7 @@ class ReportGenerator(BaseAgent):
                 restored_report = state.get('report_obj')
                 if restored_report is not None:
                     report = restored_report
-                    start_index = self._section_index_done
-                    self.logger.info(f"[Resume] Restored report object, will resume from section_index={start_index}")
+                    self.logger.info(f"[Resume] Restored report object, finished sections={sorted(self._sections_done)}")
         
         # Phase 0: outline generation
         if self._phase == 'outline' or report is None:
@@ -807,6 +996,10 @@ class ReportGenerator(BaseAgent):
                 checkpoint_name='outline_latest.pkl'
             )
             self._phase = 'sections'
+            # A new outline invalidates any section progress
+            self._sections_done = set()
+            self._section_index_done = 0
+            self._clear_section_checkpoints()
             # Persist outline state
             await self.save(
                 state={
@@ -824,55 +1017,15 @@ class ReportGenerator(BaseAgent):
         # Phase 1: per-section generation
         if self._phase == 'sections':
             self.logger.info("[Phase1] Begin generating sections")
-            # TODO: parallel generation of sections
-            for idx, section in enumerate(report.sections):
-                if idx < start_index:
-                    continue
-                section_input_data = input_data.copy()
-                section_input_data['section_outline'] = section.outline
-                self.logger.info(f"[Phase1] Section {idx+1}/{len(report.sections)} start")
-                
-                # Prepare executor with data access functions for agentic workflow
-                await self._prepare_executor()
-                
-                # Each section run has its own checkpoint for resume support
-                section_result = await super().async_run(
-                    input_data=section_input_data,
-                    max_iterations=max_iterations,
-                    stop_words=stop_words,
-                    echo=echo,
-                    resume=resume and idx == start_index,
-                    checkpoint_name=f'section_{idx}.pkl'
-                )
-                draft_section = section_result['final_result']
-                self.logger.debug(f"[Phase1] Draft section length={len(draft_section)}")
-                
-                # Final polish for the section content
-                final_section = await self._final_polish(section_input_data, draft_section)
-                self.logger.debug(f"[Phase1] Final section length={len(final_section)}")
-                self.memory.add_log(
-                    id=self.id,
-                    type=self.type,
-                    input_data=section_input_data,
-                    output_data=section_result,
-                    error=False,
-                    note=f"Report generator executed successfully"
-                )
-                section.set_content(final_section) 
-                # Save global progress after each section to resume later
-                await self.save(
-                    state={
-                        'phase': 'sections',
-                        'section_index': idx + 1,
-                        'report_obj': report,
-                        'input_data': input_data,
-                    },
-                    checkpoint_name=checkpoint_name,
-                )
-                self.memory.save()
-                # Update in-memory progress pointer
-                self._section_index_done = idx + 1
-                self.logger.info(f"[Phase1] Section {idx+1} done, checkpoint saved (section_index={self._section_index_done})")
+            await self._generate_sections(
+                report,
+                input_data,
+                max_iterations=max_iterations,
+                stop_words=stop_words,
+                echo=echo,
+                resume=resume,
+                checkpoint_name=checkpoint_name,
+            )
             
             # Move to post-process stage once all sections are done
             self._phase = 'post_process'
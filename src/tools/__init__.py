@@ -7,7 +7,8 @@ This module provides a unified interface for accessing all available financial d
 import importlib
 import inspect
 from typing import Dict, List, Type, Any, Optional
-from .base import Tool, ToolResult
+from .base import Tool, ToolResult, configure_upstream_limits
+from .cache import ToolCache, configure_tool_cache
 
 from .web.web_crawler import *
 from .web.search_engine_requests import *
@@ -17,6 +18,7 @@ from .macro.macro import *
 from .financial.company_statements import *
 from .financial.stock import *
 from .financial.market import *
+from .financial.batch import *
 from .industry.industry import *
 
 # Global registry for all tools
@@ -164,6 +166,9 @@ _auto_register_tools()
 __all__ = [
     'Tool',
     'ToolResult', 
+    'configure_upstream_limits',
+    'ToolCache',
+    'configure_tool_cache',
     'register_tool',
     'get_avail_tools',
     'get_tool_by_name',
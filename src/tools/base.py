@@ -1,7 +1,56 @@
+import asyncio
+import copy
+import functools
+import threading
 import pandas as pd
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import cache_key, get_tool_cache
+
+# Blocking calls allowed in flight per upstream data source; more than this gets us throttled.
+UPSTREAM_CONCURRENCY = {
+    "eastmoney": 4,
+    "jin10": 2,
+    "ths": 2,
+    "sina": 4,
+    "default": 4,
+}
+_upstream_executors: dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+# (event loop, tool class, params digest) -> (task, caller futures) of the identical call in flight
+_inflight: dict[tuple, tuple[asyncio.Task, list]] = {}
+
+
+def configure_upstream_limits(limits: dict | None):
+    """
+    Override per-upstream concurrency limits (e.g. the `tool_concurrency` config section).
+    Pools that already exist are replaced; calls already running finish on the old pool.
+    """
+    with _executors_lock:
+        for upstream, limit in (limits or {}).items():
+            UPSTREAM_CONCURRENCY[upstream] = max(1, int(limit))
+            old = _upstream_executors.pop(upstream, None)
+            if old is not None:
+                old.shutdown(wait=False)
+
+
+def _upstream_executor(upstream: str) -> ThreadPoolExecutor:
+    with _executors_lock:
+        executor = _upstream_executors.get(upstream)
+        if executor is None:
+            limit = UPSTREAM_CONCURRENCY.get(upstream, UPSTREAM_CONCURRENCY["default"])
+            executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"tool-{upstream}")
+            _upstream_executors[upstream] = executor
+        return executor
+
 
 class Tool:
+    # Upstream data source whose concurrency limit applies to this tool's blocking calls
+    upstream = "default"
+    # Seconds a result stays fresh in the tool result cache; None falls back to the cache default
+    cache_ttl: float | None = None
+
     def __init__(
         self,
         name: str,
@@ -34,10 +83,78 @@ class Tool:
         """
         raise NotImplementedError
 
+    async def fetch(self, **kwargs):
+        """
+        api_function behind the tool result cache (see configure_tool_cache); agents call tools
+        through this. Identical concurrent calls, e.g. from several collectors asking for the same
+        balance sheet, share one in-flight fetch. In offline mode a cache miss returns no results
+        instead of fetching.
+        """
+        loop = asyncio.get_running_loop()
+        key = (loop, type(self).__name__, cache_key(self.name, kwargs))
+        flight = _inflight.get(key)
+        if flight is None:
+            task = loop.create_task(self._fetch_cached(**kwargs))
+            waiters: list[asyncio.Future] = []
+            _inflight[key] = (task, waiters)
+
+            def done(finished: asyncio.Task):
+                _inflight.pop(key, None)
+                # Each caller gets its own result object, copied here before any of them resumes, so
+                # edits to a DataFrame never reach another caller (a lone caller keeps the original).
+                waiting = [waiter for waiter in waiters if not waiter.done()]
+                for waiter in waiting:
+                    if finished.cancelled():
+                        waiter.cancel()
+                    elif finished.exception() is not None:
+                        waiter.set_exception(finished.exception())
+                    elif len(waiting) == 1:
+                        waiter.set_result(finished.result())
+                    else:
+                        try:
+                            waiter.set_result(copy.deepcopy(finished.result()))
+                        except Exception as e:
+                            waiter.set_exception(e)
+                # The fetch outlives cancelled callers; make sure its error is not reported as unretrieved
+                if not finished.cancelled():
+                    finished.exception()
+
+            task.add_done_callback(done)
+        else:
+            task, waiters = flight
+        # Cancelling this caller cancels only its own future, never the fetch others are waiting on
+        waiter = loop.create_future()
+        waiters.append(waiter)
+        return await waiter
+
+    async def _fetch_cached(self, **kwargs):
+        cache = get_tool_cache()
+        if cache is None or (cache.ttl_for(self) <= 0 and not cache.offline):
+            return await self.api_function(**kwargs)
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(None, cache.get, self, kwargs)
+        if cached is not None:
+            return cached
+        if cache.offline:
+            print(f"Warning: No cached result for {self.name} {kwargs}; skipping the fetch in offline mode.")
+            return []
+        results = await self.api_function(**kwargs)
+        await loop.run_in_executor(None, cache.put, self, kwargs, results)
+        return results
+
+    async def run_blocking(self, func, *args, upstream: str | None = None, **kwargs):
+        """
+        Run a blocking data-source call (akshare, efinance, requests) on the bounded thread pool
+        of its upstream, so the event loop keeps serving other agents while it waits.
+        """
+        loop = asyncio.get_running_loop()
+        executor = _upstream_executor(upstream or self.upstream)
+        return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
     async def get_data(self, task):
         params = self.prepare_params(task)
         try:
-            data = await self.api_function(**params)
+            data = await self.fetch(**params)
             task.all_results.extend(data)
             return data
         except Exception as e:
@@ -45,6 +162,43 @@ class Tool:
             return []
 
 
+async def fetch_for_tickers(tool: Tool, stock_codes, concurrency: int = 5, **kwargs):
+    """
+    Call tool.fetch for every ticker with at most `concurrency` calls in flight and stack the
+    results into one long-format DataFrame whose first column is "ticker".
+    Returns (table or None, tickers that returned no data).
+    """
+    if isinstance(stock_codes, str):
+        stock_codes = [code for code in stock_codes.replace(";", ",").split(",")]
+    stock_codes = list(dict.fromkeys(str(code).strip() for code in stock_codes if str(code).strip()))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch_one(code: str):
+        async with semaphore:
+            try:
+                return await tool.fetch(stock_code=code, **kwargs)
+            except Exception as e:
+                print(f"Failed to fetch {tool.name} for {code}", e)
+                return []
+
+    responses = await asyncio.gather(*(fetch_one(code) for code in stock_codes))
+    frames, failed = [], []
+    for code, response in zip(stock_codes, responses):
+        data = response[0].data if response else None
+        if isinstance(data, pd.Series):
+            data = data.to_frame().T
+        elif isinstance(data, dict):
+            data = pd.DataFrame([data])
+        if not isinstance(data, pd.DataFrame) or data.empty:
+            failed.append(code)
+            continue
+        data = data.reset_index(drop=True)
+        data.insert(0, "ticker", code)
+        frames.append(data)
+    table = pd.concat(frames, ignore_index=True) if frames else None
+    return table, failed
+
+
 class ToolResult:
     def __init__(self, name, description, data, source = ""):
         self.name = name
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "quantharbor" / "tools"
+
+
+def cache_key(tool_name: str, params: dict) -> str:
+    """Digest of (tool name, normalized params): key order and surrounding whitespace do not matter."""
+    normalized = {k: v.strip() if isinstance(v, str) else v for k, v in params.items()}
+    raw = json.dumps([tool_name, normalized], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ToolCache:
+    """
+    On-disk cache of tool results keyed by (tool name, normalized params).
+
+    Each entry is a directory holding meta.json plus one file per ToolResult: DataFrames are stored
+    as Parquet (pickle when Parquet cannot represent them, e.g. non-string column names), anything
+    else is pickled. meta.json is written last, so an entry without it is incomplete and ignored.
+    Entries older than the tool's TTL are refetched; in offline mode they are served regardless and a
+    miss returns no data instead of reaching the network.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        offline: bool = False,
+        default_ttl: Optional[float] = None,
+        ttl: Optional[dict] = None,
+    ):
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR).expanduser()
+        self.offline = offline
+        self.default_ttl = default_ttl
+        # Per-tool overrides, by tool name or class name
+        self.ttl = dict(ttl or {})
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def ttl_for(self, tool) -> float:
+        for name in (tool.name, type(tool).__name__):
+            if name in self.ttl:
+                return float(self.ttl[name])
+        if tool.cache_ttl is not None:
+            return float(tool.cache_ttl)
+        return float(self.default_ttl or 0)
+
+    def _entry_dir(self, tool, params: dict) -> Path:
+        return self.cache_dir / type(tool).__name__ / cache_key(tool.name, params)
+
+    def get(self, tool, params: dict) -> Optional[list]:
+        """Cached results, or None on a miss (or an expired entry when online)."""
+        entry = self._entry_dir(tool, params)
+        try:
+            with open(entry / "meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if not self.offline and time.time() - meta["created_at"] > self.ttl_for(tool):
+                return None
+            return [self._load_item(entry, item) for item in meta["items"]]
+        except (OSError, ValueError, KeyError, pickle.UnpicklingError) as e:
+            if (entry / "meta.json").exists():
+                print(f"Warning: Ignoring unreadable tool cache entry {entry}: {e}")
+            return None
+
+    def put(self, tool, params: dict, results: list) -> None:
+        """Store results; failed fetches (no results, or results without data) are not cached."""
+        if not results or any(item.data is None for item in results):
+            return
+        entry = self._entry_dir(tool, params)
+        tmp = entry.with_name(f"{entry.name}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp.mkdir(parents=True)
+        try:
+            items = [self._dump_item(tmp, idx, item) for idx, item in enumerate(results)]
+            meta = {"tool": tool.name, "params": params, "created_at": time.time(), "items": items}
+            with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False, default=str)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+        except Exception as e:
+            print(f"Warning: Could not cache results of {tool.name}: {e}")
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    @staticmethod
+    def _dump_item(entry: Path, idx: int, item) -> dict:
+        info = {"name": item.name, "description": item.description, "source": item.source}
+        # Parquet stringifies non-string column names, which would not round-trip
+        if isinstance(item.data, pd.DataFrame) and all(isinstance(col, str) for col in item.data.columns):
+            try:
+                item.data.to_parquet(entry / f"{idx}.parquet")
+                info["file"] = f"{idx}.parquet"
+                return info
+            except Exception:
+                pass
+        with open(entry / f"{idx}.pkl", "wb") as f:
+            pickle.dump(item.data, f)
+        info["file"] = f"{idx}.pkl"
+        return info
+
+    @staticmethod
+    def _load_item(entry: Path, info: dict):
+        from .base import ToolResult
+
+        path = entry / info["file"]
+        if path.suffix == ".parquet":
+            data = pd.read_parquet(path)
+        else:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+        return ToolResult(name=info["name"], description=info["description"], data=data, source=info["source"])
+
+
+_tool_cache: Optional[ToolCache] = None
+
+
+def configure_tool_cache(settings: Optional[dict]) -> Optional[ToolCache]:
+    """
+    Enable the tool result cache from the `tool_cache` config section (None or enabled: false
+    turns it off). TOOL_CACHE_OFFLINE=1 forces offline mode, e.g. for benchmarks.
+    """
+    global _tool_cache
+    settings = dict(settings or {})
+    if not settings.get("enabled", bool(settings)):
+        _tool_cache = None
+        return None
+    offline = settings.get("offline", False) or os.getenv("TOOL_CACHE_OFFLINE", "").strip().lower() in {"1", "true", "yes"}
+    _tool_cache = ToolCache(
+        cache_dir=settings.get("dir"),
+        offline=bool(offline),
+        default_ttl=settings.get("default_ttl"),
+        ttl=settings.get("ttl"),
+    )
+    return _tool_cache
+
+
+def get_tool_cache() -> Optional[ToolCache]:
+    return _tool_cache
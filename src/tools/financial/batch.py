@@ -0,0 +1,119 @@
+from ..base import Tool, ToolResult, fetch_for_tickers
+from .company_statements import BalanceSheet, IncomeStatement, CashFlowStatement
+from .stock import StockBasicInfo, StockPrice
+
+# Per-ticker calls in flight per batch; the upstream limits still apply on top of this
+BATCH_CONCURRENCY = 5
+
+_STOCK_CODES_PARAM = {
+    "name": "stock_codes",
+    "type": "list[str]",
+    "description": "Tickers to fetch, e.g., ['00700', '09988', '03690']",
+    "required": True,
+}
+_MARKET_PARAM = {"name": "market", "type": "str", "description": "Market flag: HK or A (same for every ticker)", "required": True}
+_PERIOD_PARAM = {"name": "period", "type": "str", "description": "Reporting period (defaults to annual)", "required": False}
+
+
+def _batch_result(tool: Tool, table, failed: list) -> list:
+    description = f"{tool.short_description} One row group per ticker, keyed by the 'ticker' column."
+    if failed:
+        description += f" No data for: {', '.join(failed)}."
+    return [
+        ToolResult(
+            name=tool.name,
+            description=description,
+            data=table,
+            source=tool.source,
+        )
+    ]
+
+
+class BatchBalanceSheet(Tool):
+    def __init__(self):
+        super().__init__(
+            name="Balance sheets (multiple tickers)",
+            description="Balance sheets for a list of tickers in one call, for peer comparison.",
+            parameters=[_STOCK_CODES_PARAM, _MARKET_PARAM, _PERIOD_PARAM],
+        )
+        self.single_tool = BalanceSheet()
+        self.source = "Eastmoney financials: balance sheets. https://emweb.securities.eastmoney.com/PC_HSF10/NewFinanceAnalysis/Index?type=web"
+
+    async def api_function(self, stock_codes: list, market: str = "HK", period: str = "年度"):
+        """
+        Fetch balance sheets for all tickers concurrently.
+        """
+        table, failed = await fetch_for_tickers(self.single_tool, stock_codes, BATCH_CONCURRENCY, market=market, period=period)
+        return _batch_result(self, table, failed)
+
+
+class BatchIncomeStatement(Tool):
+    def __init__(self):
+        super().__init__(
+            name="Income statements (multiple tickers)",
+            description="Income statements for a list of tickers in one call, for peer comparison.",
+            parameters=[_STOCK_CODES_PARAM, _MARKET_PARAM, _PERIOD_PARAM],
+        )
+        self.single_tool = IncomeStatement()
+        self.source = "Eastmoney / iFinD (10jqka) financials: income statements."
+
+    async def api_function(self, stock_codes: list, market: str = "HK", period: str = "年度"):
+        """
+        Fetch income statements for all tickers concurrently.
+        """
+        table, failed = await fetch_for_tickers(self.single_tool, stock_codes, BATCH_CONCURRENCY, market=market, period=period)
+        return _batch_result(self, table, failed)
+
+
+class BatchCashFlowStatement(Tool):
+    def __init__(self):
+        super().__init__(
+            name="Cash-flow statements (multiple tickers)",
+            description="Cash-flow statements for a list of tickers in one call, for peer comparison.",
+            parameters=[_STOCK_CODES_PARAM, _MARKET_PARAM, _PERIOD_PARAM],
+        )
+        self.single_tool = CashFlowStatement()
+        self.source = "Eastmoney / iFinD (10jqka) financials: cash-flow statements."
+
+    async def api_function(self, stock_codes: list, market: str = "HK", period: str = "年度"):
+        """
+        Fetch cash-flow statements for all tickers concurrently.
+        """
+        table, failed = await fetch_for_tickers(self.single_tool, stock_codes, BATCH_CONCURRENCY, market=market, period=period)
+        return _batch_result(self, table, failed)
+
+
+class BatchStockPrice(Tool):
+    def __init__(self):
+        super().__init__(
+            name="Stock candlestick data (multiple tickers)",
+            description="Daily OHLCV data for a list of tickers in one call, for peer comparison.",
+            parameters=[_STOCK_CODES_PARAM, {**_MARKET_PARAM, "required": False}],
+        )
+        self.single_tool = StockPrice()
+        self.source = "Exchange trading data: OHLCV history."
+
+    async def api_function(self, stock_codes: list, market: str = "HK"):
+        """
+        Fetch quote histories for all tickers concurrently.
+        """
+        table, failed = await fetch_for_tickers(self.single_tool, stock_codes, BATCH_CONCURRENCY, market=market)
+        return _batch_result(self, table, failed)
+
+
+class BatchStockBasicInfo(Tool):
+    def __init__(self):
+        super().__init__(
+            name="Stock profiles (multiple tickers)",
+            description="Basic corporate profiles for a list of tickers in one call, for peer comparison.",
+            parameters=[_STOCK_CODES_PARAM, _MARKET_PARAM],
+        )
+        self.single_tool = StockBasicInfo()
+        self.source = "Xueqiu: Stock basic information. https://xueqiu.com/S"
+
+    async def api_function(self, stock_codes: list, market: str = "HK"):
+        """
+        Fetch corporate profiles for all tickers concurrently.
+        """
+        table, failed = await fetch_for_tickers(self.single_tool, stock_codes, BATCH_CONCURRENCY, market=market)
+        return _batch_result(self, table, failed)
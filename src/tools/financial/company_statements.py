@@ -77,6 +77,9 @@ def preprocess_income_data(data: pd.DataFrame) -> pd.DataFrame:
     return filtered_df
 
 class BalanceSheet(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 30 * 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Balance sheet",
@@ -145,7 +148,7 @@ class BalanceSheet(Tool):
         period = "年度"
         try:
             if market == "HK":
-                data = ak.stock_financial_hk_report_em(
+                data = await self.run_blocking(ak.stock_financial_hk_report_em,
                     stock = stock_code,
                     symbol = "资产负债表",
                     indicator = period,
@@ -155,7 +158,7 @@ class BalanceSheet(Tool):
                 except Exception as e:
                     print("Failed to preprocess balance-sheet data", e)
             elif market == "A":
-                data = ak.stock_balance_sheet_by_yearly_em(
+                data = await self.run_blocking(ak.stock_balance_sheet_by_yearly_em,
                     symbol = stock_code,
                 )
             else:
@@ -173,6 +176,9 @@ class BalanceSheet(Tool):
         ]
 
 class IncomeStatement(Tool):
+    upstream = "ths"
+    cache_ttl = 30 * 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Income statement",
@@ -239,13 +245,13 @@ class IncomeStatement(Tool):
         period = "年度"
         try:
             if market == "HK":
-                data = ak.stock_financial_hk_report_em(stock=stock_code, symbol="利润表", indicator=period)
+                data = await self.run_blocking(ak.stock_financial_hk_report_em, stock=stock_code, symbol="利润表", indicator=period, upstream="eastmoney")
                 try:
                     data = self._preprocess_data(data)
                 except Exception as e:
                     print("Failed to preprocess income-statement data", e)
             elif market == "A":
-                data = ak.stock_financial_benefit_ths(symbol=stock_code, indicator='按年度')
+                data = await self.run_blocking(ak.stock_financial_benefit_ths, symbol=stock_code, indicator='按年度')
             else:
                 raise ValueError(f"Unsupported market flag: {market}. Use 'HK' or 'A'.")
         except Exception as e:
@@ -264,6 +270,9 @@ class IncomeStatement(Tool):
 
 
 class CashFlowStatement(Tool):
+    upstream = "ths"
+    cache_ttl = 30 * 24 * 3600
+
     def __init__(self):
         super().__init__(
             name="Cash-flow statement",
@@ -329,14 +338,14 @@ class CashFlowStatement(Tool):
         period = "年度"
         try:
             if market == "HK":
-                data = ak.stock_financial_hk_report_em(stock=stock_code, symbol="现金流量表", indicator=period)
+                data = await self.run_blocking(ak.stock_financial_hk_report_em, stock=stock_code, symbol="现金流量表", indicator=period, upstream="eastmoney")
                 try:
                     data = self._preprocess_data(data)
                 except Exception as e:
                     print("Failed to preprocess cash-flow data", e)
             elif market == "A":
                 #data = ak.stock_cash_flow_sheet_by_yearly_em(symbol=stock_code)
-                data = ak.stock_financial_cash_ths(symbol=stock_code, indicator='按年度')
+                data = await self.run_blocking(ak.stock_financial_cash_ths, symbol=stock_code, indicator='按年度')
             else:
                 raise ValueError(f"Unsupported market flag: {market}. Use 'HK' or 'A'.")
         except Exception as e:
@@ -4,6 +4,9 @@ from ..base import Tool, ToolResult
 
 
 class HuShen_Index(Tool):
+    upstream = "sina"
+    cache_ttl = 3600
+
     def __init__(self):
         super().__init__(
             name="CSI 300 daily data",
@@ -22,7 +25,7 @@ class HuShen_Index(Tool):
         Fetch the CSI 300 time series.
         """
         try:
-            data = ak.stock_zh_index_daily(symbol="sh000300")
+            data = await self.run_blocking(ak.stock_zh_index_daily, symbol="sh000300")
         except Exception as e:
             print("Failed to fetch CSI 300 data", e)
             data = None
@@ -40,6 +43,9 @@ class HuShen_Index(Tool):
 
 
 class HengSheng_Index(Tool):
+    upstream = "sina"
+    cache_ttl = 3600
+
     def __init__(self):
         super().__init__(
             name="Hang Seng Index daily data",
@@ -58,7 +64,7 @@ class HengSheng_Index(Tool):
         Fetch the Hang Seng Index time series.
         """
         try:
-            data = ak.stock_hk_index_daily_sina(symbol="HSI")
+            data = await self.run_blocking(ak.stock_hk_index_daily_sina, symbol="HSI")
         except Exception as e:
             print("Failed to fetch Hang Seng data", e)
             data = None
@@ -75,6 +81,9 @@ class HengSheng_Index(Tool):
             return []
         
 class ShangZheng_Index(Tool):
+    upstream = "sina"
+    cache_ttl = 3600
+
     def __init__(self):
         super().__init__(
             name="SSE Composite daily data",
@@ -93,7 +102,7 @@ class ShangZheng_Index(Tool):
         Fetch the SSE Composite time series.
         """
         try:
-            data = ak.stock_zh_index_daily(symbol="sh000001")
+            data = await self.run_blocking(ak.stock_zh_index_daily, symbol="sh000001")
         except Exception as e:
             print("Failed to fetch SSE Composite data", e)
             data = None
@@ -111,6 +120,9 @@ class ShangZheng_Index(Tool):
 
 
 class NSDK_Index(Tool):
+    upstream = "sina"
+    cache_ttl = 3600
+
     def __init__(self):
         super().__init__(
             name="Nasdaq Composite daily data",
@@ -129,7 +141,7 @@ class NSDK_Index(Tool):
         Fetch the Nasdaq Composite time series.
         """
         try:
-            data = ak.index_us_stock_sina(symbol=".IXIC")
+            data = await self.run_blocking(ak.index_us_stock_sina, symbol=".IXIC")
         except Exception as e:
             print("Failed to fetch Nasdaq data", e)
             data = None
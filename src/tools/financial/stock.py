@@ -9,6 +9,9 @@ from ..base import Tool, ToolResult
 
 # TODO: Add more granular Xueqiu endpoints (differentiate SH/SZ ahead of time).
 class StockBasicInfo(Tool):
+    upstream = "ths"
+    cache_ttl = 7 * 24 * 3600
+
     def __init__(self):
         super().__init__(
             name="Stock profile",
@@ -35,9 +38,9 @@ class StockBasicInfo(Tool):
         """
         try:
             if market == "A":
-                data = ak.stock_zyjs_ths(symbol=stock_code)
+                data = await self.run_blocking(ak.stock_zyjs_ths, symbol=stock_code)
             elif market == "HK":
-                data = ak.stock_hk_company_profile_em(symbol=stock_code)
+                data = await self.run_blocking(ak.stock_hk_company_profile_em, symbol=stock_code, upstream="eastmoney")
             else:
                 raise ValueError(f"Unsupported market flag: {market}. Use 'HK' or 'A'.")
         except Exception as e:
@@ -54,6 +57,9 @@ class StockBasicInfo(Tool):
 
 
 class ShareHoldingStructure(Tool):
+    upstream = "sina"
+    cache_ttl = 7 * 24 * 3600
+
     def __init__(self):
         super().__init__(
             name="Shareholding structure",
@@ -80,15 +86,16 @@ class ShareHoldingStructure(Tool):
         """
         try:
             if market == "A":
-                data = ak.stock_main_stock_holder(stock=stock_code)
+                data = await self.run_blocking(ak.stock_main_stock_holder, stock=stock_code)
             elif market == "HK":
                 # Scrape data from Eastmoney
                 headers = {
                     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
                 }
-                output = requests.get(
+                output = await self.run_blocking(requests.get,
                     f"https://datacenter.eastmoney.com/securities/api/data/v1/get?reportName=RPT_HKF10_EQUITYCHG_HOLDER&columns=SECURITY_CODE%2CSECUCODE%2CORG_CODE%2CNOTICE_DATE%2CREPORT_DATE%2CHOLDER_NAME%2CTOTAL_SHARES%2CTOTAL_SHARES_RATIO%2CDIRECT_SHARES%2CSHARES_CHG_RATIO%2CSHARES_TYPE%2CEQUITY_TYPE%2CHOLD_IDENTITY%2CIS_ZJ&quoteColumns=&filter=(SECUCODE%3D%22{stock_code}.HK%22)(REPORT_DATE%3D%272024-12-31%27)&pageNumber=1&pageSize=&sortTypes=-1%2C-1&sortColumns=EQUITY_TYPE%2CTOTAL_SHARES&source=F10&client=PC&v=032666133943694553",
                     headers = headers,
+                    upstream = "eastmoney",
                 )
                 try:
                     html = output.text
@@ -125,6 +132,9 @@ class ShareHoldingStructure(Tool):
         ]
 
 class StockBaseInfo(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name="Equity valuation metrics",
@@ -142,7 +152,7 @@ class StockBaseInfo(Tool):
         Fetch fundamental metrics for the requested ticker.
         """
         try:
-            data = ef.stock.get_base_info(stock_code)
+            data = await self.run_blocking(ef.stock.get_base_info, stock_code)
         except Exception as e:
             print("Failed to fetch stock valuation info", e)
             data = None
@@ -157,6 +167,9 @@ class StockBaseInfo(Tool):
 
 
 class StockPrice(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 3600
+
     def __init__(self):
         super().__init__(
             name="Stock candlestick data",
@@ -174,7 +187,7 @@ class StockPrice(Tool):
         Fetch historical quote data for the requested ticker.
         """
         try:
-            data = ef.stock.get_quote_history(stock_code)
+            data = await self.run_blocking(ef.stock.get_quote_history, stock_code)
         except Exception as e:
             print("Failed to fetch stock price history", e)
             data = None
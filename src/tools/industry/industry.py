@@ -4,6 +4,9 @@ from ..base import Tool, ToolResult
 
 
 class Industry_gyzjz(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Industrial value-added growth",
@@ -12,7 +15,7 @@ class Industry_gyzjz(Tool):
         ) 
         
     async def api_function(self):
-        data = ak.macro_china_gyzjz()
+        data = await self.run_blocking(ak.macro_china_gyzjz)
         return [
             ToolResult(
                 name=self.name,
@@ -23,6 +26,9 @@ class Industry_gyzjz(Tool):
         ]
         
 class Industry_production_yoy(Tool):
+    upstream = "jin10"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Above-scale industrial production YoY",
@@ -31,7 +37,7 @@ class Industry_production_yoy(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_industrial_production_yoy()
+        data = await self.run_blocking(ak.macro_china_industrial_production_yoy)
         return [
             ToolResult(
                 name=self.name,
@@ -42,6 +48,9 @@ class Industry_production_yoy(Tool):
         ]
         
 class Industry_China_PMI(Tool):
+    upstream = "jin10"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Official manufacturing PMI",
@@ -50,7 +59,7 @@ class Industry_China_PMI(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_pmi_yearly()
+        data = await self.run_blocking(ak.macro_china_pmi_yearly)
         return [
             ToolResult(
                 name=self.name,
@@ -61,6 +70,9 @@ class Industry_China_PMI(Tool):
         ]
         
 class Industry_China_CX_services_PMI(Tool):
+    upstream = "jin10"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Caixin services PMI",
@@ -69,7 +81,7 @@ class Industry_China_CX_services_PMI(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_cx_services_pmi_yearly()
+        data = await self.run_blocking(ak.macro_china_cx_services_pmi_yearly)
         return [
             ToolResult(
                 name=self.name,
@@ -80,6 +92,9 @@ class Industry_China_CX_services_PMI(Tool):
         ]
         
 class Industry_China_CPI(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Consumer price index",
@@ -88,7 +103,7 @@ class Industry_China_CPI(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_cpi()
+        data = await self.run_blocking(ak.macro_china_cpi)
         return [
             ToolResult(
                 name=self.name,
@@ -99,6 +114,9 @@ class Industry_China_CPI(Tool):
         ]
         
 class Industry_China_GDP(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Gross domestic product",
@@ -107,7 +125,7 @@ class Industry_China_GDP(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_gdp()
+        data = await self.run_blocking(ak.macro_china_gdp)
         return [
             ToolResult(
                 name=self.name,
@@ -118,6 +136,9 @@ class Industry_China_GDP(Tool):
         ]
         
 class Industry_China_PPI(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Producer price index",
@@ -126,7 +147,7 @@ class Industry_China_PPI(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_ppi()
+        data = await self.run_blocking(ak.macro_china_ppi)
         return [
             ToolResult(
                 name=self.name,
@@ -137,6 +158,9 @@ class Industry_China_PPI(Tool):
         ]
         
 class Industry_China_xfzxx(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Consumer confidence index",
@@ -145,7 +169,7 @@ class Industry_China_xfzxx(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_xfzxx()
+        data = await self.run_blocking(ak.macro_china_xfzxx)
         return [
             ToolResult(
                 name=self.name,
@@ -156,6 +180,9 @@ class Industry_China_xfzxx(Tool):
         ]
         
 class Industry_China_consumer_goods_retail(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Total retail sales of consumer goods",
@@ -164,7 +191,7 @@ class Industry_China_consumer_goods_retail(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_consumer_goods_retail()
+        data = await self.run_blocking(ak.macro_china_consumer_goods_retail)
         return [
             ToolResult(
                 name=self.name,
@@ -175,6 +202,9 @@ class Industry_China_consumer_goods_retail(Tool):
         ]
         
 class Industry_China_retail_price_index(Tool):
+    upstream = "sina"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Retail price index",
@@ -183,7 +213,7 @@ class Industry_China_retail_price_index(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_retail_price_index()
+        data = await self.run_blocking(ak.macro_china_retail_price_index)
         return [
             ToolResult(
                 name=self.name,
@@ -194,6 +224,9 @@ class Industry_China_retail_price_index(Tool):
         ]
         
 class Industry_China_qyspjg(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Enterprise commodity price index",
@@ -202,7 +235,7 @@ class Industry_China_qyspjg(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_qyspjg()
+        data = await self.run_blocking(ak.macro_china_qyspjg)
         return [
             ToolResult(
                 name=self.name,
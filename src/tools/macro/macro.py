@@ -4,6 +4,8 @@ from ..base import Tool, ToolResult
 
 
 class Macro_China_Leverage_Ratio(Tool):
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "China macro leverage ratio",
@@ -12,7 +14,7 @@ class Macro_China_Leverage_Ratio(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_cnbs()
+        data = await self.run_blocking(ak.macro_cnbs)
         return [
             ToolResult(
                 name=self.name,
@@ -23,6 +25,9 @@ class Macro_China_Leverage_Ratio(Tool):
         ]
         
 class Macro_China_qyspjg(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Enterprise commodity price index",
@@ -31,7 +36,7 @@ class Macro_China_qyspjg(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_qyspjg()
+        data = await self.run_blocking(ak.macro_china_qyspjg)
         return [
             ToolResult(
                 name=self.name,
@@ -42,6 +47,9 @@ class Macro_China_qyspjg(Tool):
         ]
         
 class Macro_China_LPR(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "China LPR benchmark rates",
@@ -50,7 +58,7 @@ class Macro_China_LPR(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_lpr()
+        data = await self.run_blocking(ak.macro_china_lpr)
         return [
             ToolResult(
                 name=self.name,
@@ -61,6 +69,8 @@ class Macro_China_LPR(Tool):
         ]
     
 class Macro_China_urban_unemployment(Tool):
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Urban surveyed unemployment rate",
@@ -69,7 +79,7 @@ class Macro_China_urban_unemployment(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_urban_unemployment()
+        data = await self.run_blocking(ak.macro_china_urban_unemployment)
         return [
             ToolResult(
                 name=self.name,
@@ -80,6 +90,8 @@ class Macro_China_urban_unemployment(Tool):
         ]
         
 class Macro_China_shrzgm(Tool):
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Total social financing increment",
@@ -88,7 +100,7 @@ class Macro_China_shrzgm(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_shrzgm()
+        data = await self.run_blocking(ak.macro_china_shrzgm)
         return [
             ToolResult(
                 name=self.name,
@@ -99,6 +111,9 @@ class Macro_China_shrzgm(Tool):
         ]
         
 class Macro_China_GDP_yearly(Tool):
+    upstream = "jin10"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "China GDP YoY",
@@ -107,7 +122,7 @@ class Macro_China_GDP_yearly(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_gdp_yearly()
+        data = await self.run_blocking(ak.macro_china_gdp_yearly)
         return [
             ToolResult(
                 name=self.name,
@@ -118,6 +133,9 @@ class Macro_China_GDP_yearly(Tool):
         ]
         
 class Macro_China_CPI_yearly(Tool):
+    upstream = "jin10"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "China CPI YoY",
@@ -126,7 +144,7 @@ class Macro_China_CPI_yearly(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_cpi_yearly()
+        data = await self.run_blocking(ak.macro_china_cpi_yearly)
         return [
             ToolResult(
                 name=self.name,
@@ -137,6 +155,9 @@ class Macro_China_CPI_yearly(Tool):
         ]
         
 class Macro_China_PPI_yearly(Tool):
+    upstream = "jin10"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "China PPI YoY",
@@ -145,7 +166,7 @@ class Macro_China_PPI_yearly(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_ppi_yearly()
+        data = await self.run_blocking(ak.macro_china_ppi_yearly)
         return [
             ToolResult(
                 name=self.name,
@@ -156,6 +177,9 @@ class Macro_China_PPI_yearly(Tool):
         ]
         
 class Macro_USA_CPI_yearly(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "US CPI YoY",
@@ -164,7 +188,7 @@ class Macro_USA_CPI_yearly(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_usa_cpi_yoy()
+        data = await self.run_blocking(ak.macro_usa_cpi_yoy)
         return [
             ToolResult(
                 name=self.name,
@@ -175,6 +199,9 @@ class Macro_USA_CPI_yearly(Tool):
         ]
         
 class Macro_China_exports_yearly(Tool):
+    upstream = "jin10"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "China exports YoY (USD)",
@@ -183,7 +210,7 @@ class Macro_China_exports_yearly(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_exports_yoy()
+        data = await self.run_blocking(ak.macro_china_exports_yoy)
         return [
             ToolResult(
                 name=self.name,
@@ -194,6 +221,9 @@ class Macro_China_exports_yearly(Tool):
         ]
 
 class Macro_China_imports_yearly(Tool):
+    upstream = "jin10"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "China imports YoY (USD)",
@@ -202,7 +232,7 @@ class Macro_China_imports_yearly(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_imports_yoy()
+        data = await self.run_blocking(ak.macro_china_imports_yoy)
         return [
             ToolResult(
                 name=self.name,
@@ -213,6 +243,9 @@ class Macro_China_imports_yearly(Tool):
         ]
 
 class Macro_China_trade_balance(Tool):
+    upstream = "jin10"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "China trade balance (USD bn)",
@@ -221,7 +254,7 @@ class Macro_China_trade_balance(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_trade_balance()
+        data = await self.run_blocking(ak.macro_china_trade_balance)
         return [
             ToolResult(
                 name=self.name,
@@ -232,6 +265,9 @@ class Macro_China_trade_balance(Tool):
         ]
 
 class Macro_China_czsr(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Fiscal revenue",
@@ -240,7 +276,7 @@ class Macro_China_czsr(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_czsr()
+        data = await self.run_blocking(ak.macro_china_czsr)
         return [
             ToolResult(
                 name=self.name,
@@ -251,6 +287,9 @@ class Macro_China_czsr(Tool):
         ]
         
 class Macro_China_whxd(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Foreign-exchange loan data",
@@ -259,7 +298,7 @@ class Macro_China_whxd(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_whxd()
+        data = await self.run_blocking(ak.macro_china_whxd)
         return [
             ToolResult(
                 name=self.name,
@@ -270,6 +309,8 @@ class Macro_China_whxd(Tool):
         ]
 
 class Macro_China_bond_public(Tool):
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "New bond issuance",
@@ -278,7 +319,7 @@ class Macro_China_bond_public(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_bond_public()
+        data = await self.run_blocking(ak.macro_china_bond_public)
         return [
             ToolResult(
                 name=self.name,
@@ -289,6 +330,9 @@ class Macro_China_bond_public(Tool):
         ]
 
 class Macro_China_bank_balance(Tool):
+    upstream = "sina"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Central bank balance sheet",
@@ -297,7 +341,7 @@ class Macro_China_bank_balance(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_central_bank_balance()
+        data = await self.run_blocking(ak.macro_china_central_bank_balance)
         return [
             ToolResult(
                 name=self.name,
@@ -308,6 +352,9 @@ class Macro_China_bank_balance(Tool):
         ]
         
 class Macro_China_supply_of_money(Tool):
+    upstream = "sina"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Money supply",
@@ -316,7 +363,7 @@ class Macro_China_supply_of_money(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_supply_of_money()
+        data = await self.run_blocking(ak.macro_china_supply_of_money)
         return [
             ToolResult(
                 name=self.name,
@@ -327,6 +374,9 @@ class Macro_China_supply_of_money(Tool):
         ]
         
 class Macro_China_reserve_requirement_ratio(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Reserve requirement ratio",
@@ -335,7 +385,7 @@ class Macro_China_reserve_requirement_ratio(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_reserve_requirement_ratio()
+        data = await self.run_blocking(ak.macro_china_reserve_requirement_ratio)
         return [
             ToolResult(
                 name=self.name,
@@ -346,6 +396,9 @@ class Macro_China_reserve_requirement_ratio(Tool):
         ]
 
 class Macro_China_fx_gold(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "FX and gold reserves",
@@ -354,7 +407,7 @@ class Macro_China_fx_gold(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_fx_gold()
+        data = await self.run_blocking(ak.macro_china_fx_gold)
         return [
             ToolResult(
                 name=self.name,
@@ -365,6 +418,9 @@ class Macro_China_fx_gold(Tool):
         ]
 
 class Macro_China_stock_market_cap(Tool):
+    upstream = "eastmoney"
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "National stock trading statistics",
@@ -373,7 +429,7 @@ class Macro_China_stock_market_cap(Tool):
         )
         
     async def api_function(self):
-        data = ak.macro_china_stock_market_cap()
+        data = await self.run_blocking(ak.macro_china_stock_market_cap)
         return [
             ToolResult(
                 name=self.name,
@@ -384,6 +440,8 @@ class Macro_China_stock_market_cap(Tool):
         ]
 
 class Macro_China_epu_index(Tool):
+    cache_ttl = 24 * 3600
+
     def __init__(self):
         super().__init__(
             name = "Economic policy uncertainty (China)",
@@ -392,7 +450,7 @@ class Macro_China_epu_index(Tool):
         )
         
     async def api_function(self):
-        data = ak.article_epu_index(symbol="China")
+        data = await self.run_blocking(ak.article_epu_index, symbol="China")
         return [
             ToolResult(
                 name=self.name,
@@ -1,5 +1,6 @@
 from src.utils.llm import LLM, AsyncLLM
 from src.utils.code_executor_async import AsyncCodeExecutor
+from src.utils.code_executor_process import ProcessCodeExecutor, create_code_executor
 from src.utils.index_builder import IndexBuilder
 from src.utils.helper import *
 from src.utils.logger import get_logger, setup_logger
@@ -9,6 +10,8 @@ __all__ = [
     "AsyncLLM",
     "CodeExecutor",
     "AsyncCodeExecutor",
+    "ProcessCodeExecutor",
+    "create_code_executor",
     "IndexBuilder",
     "get_logger",
     "setup_logger"
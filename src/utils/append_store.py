@@ -0,0 +1,195 @@
+import os
+import json
+import struct
+import threading
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+_MAGIC = b"QHLOG1\n"
+# crc32 of (key + value), key length, value length (-1 marks a deletion)
+_HEADER = struct.Struct("<IIi")
+
+# One store per log file in this process (see open_store)
+_open_stores: Dict[str, "AppendOnlyStore"] = {}
+_open_stores_lock = threading.Lock()
+
+
+class AppendOnlyStore:
+    """
+    Crash-safe key -> JSON value store backed by an append-only binary log.
+
+    Every put appends one record [crc32, key_len, value_len, key, value], so a write costs O(entry)
+    no matter how large the store is. On open the log is replayed into memory; a torn or corrupt tail
+    left by a crash is detected through the CRC and truncated. When dead (overwritten or deleted)
+    records make up most of the file, the live entries are rewritten to a temporary file that
+    atomically replaces the log.
+    """
+
+    def __init__(self, path: str, compact_min_bytes: int = 1 << 20, compact_ratio: float = 2.0):
+        self.path = path
+        self.compact_min_bytes = compact_min_bytes
+        self.compact_ratio = compact_ratio
+        self._data: Dict[str, Any] = {}
+        self._live_bytes = 0
+        # Holders of this instance; the file is closed when the last one calls close()
+        self._refs = 1
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._load()
+        self._file = open(self.path, "ab")
+
+    @staticmethod
+    def _encode(key: str, value: Any) -> bytes:
+        key_bytes = key.encode("utf-8")
+        if value is None:
+            return _HEADER.pack(zlib.crc32(key_bytes), len(key_bytes), -1) + key_bytes
+        value_bytes = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        crc = zlib.crc32(key_bytes + value_bytes)
+        return _HEADER.pack(crc, len(key_bytes), len(value_bytes)) + key_bytes + value_bytes
+
+    @staticmethod
+    def _records(buf: bytes) -> Iterator[Tuple[int, str, Optional[bytes]]]:
+        """Yield (end_offset, key, value_bytes) for every intact record; stops at the first bad one."""
+        pos = len(_MAGIC)
+        while pos + _HEADER.size <= len(buf):
+            crc, key_len, value_len = _HEADER.unpack_from(buf, pos)
+            start = pos + _HEADER.size
+            end = start + key_len + max(value_len, 0)
+            if end > len(buf):
+                return
+            payload = buf[start:end]
+            if zlib.crc32(payload) != crc:
+                return
+            value = payload[key_len:] if value_len >= 0 else None
+            yield end, payload[:key_len].decode("utf-8"), value
+            pos = end
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < len(_MAGIC):
+            with open(self.path, "wb") as f:
+                f.write(_MAGIC)
+            return
+        with open(self.path, "rb") as f:
+            buf = f.read()
+        if not buf.startswith(_MAGIC):
+            raise ValueError(f"{self.path} is not an append-only store file.")
+        valid_end = len(_MAGIC)
+        sizes: Dict[str, int] = {}
+        for end, key, value in self._records(buf):
+            if value is None:
+                self._data.pop(key, None)
+                sizes.pop(key, None)
+            else:
+                self._data[key] = json.loads(value)
+                sizes[key] = _HEADER.size + len(key.encode("utf-8")) + len(value)
+            valid_end = end
+        self._live_bytes = sum(sizes.values())
+        if valid_end < len(buf):
+            print(f"Warning: Dropping {len(buf) - valid_end} bytes of incomplete records from {self.path}.")
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_end)
+
+    def _append(self, record: bytes) -> None:
+        self._file.write(record)
+        self._file.flush()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def items(self):
+        return self._data.items()
+
+    def put(self, key: str, value: Any) -> None:
+        record = self._encode(key, value)
+        if key in self._data:
+            self._live_bytes -= len(self._encode(key, self._data[key]))
+        self._append(record)
+        self._data[key] = value
+        self._live_bytes += len(record)
+        self._maybe_compact()
+
+    def update(self, entries: Dict[str, Any]) -> None:
+        """Append many entries with a single write."""
+        records = []
+        for key, value in entries.items():
+            if key in self._data:
+                self._live_bytes -= len(self._encode(key, self._data[key]))
+            record = self._encode(key, value)
+            records.append(record)
+            self._data[key] = value
+            self._live_bytes += len(record)
+        if records:
+            self._append(b"".join(records))
+            self._maybe_compact()
+
+    def delete(self, key: str) -> None:
+        if key not in self._data:
+            return
+        self._live_bytes -= len(self._encode(key, self._data.pop(key)))
+        self._append(self._encode(key, None))
+        self._maybe_compact()
+
+    def clear(self) -> None:
+        """Drop every entry; the log is reset in place instead of appending a tombstone per key."""
+        self._file.close()
+        with open(self.path, "wb") as f:
+            f.write(_MAGIC)
+        self._data.clear()
+        self._live_bytes = 0
+        self._file = open(self.path, "ab")
+
+    def _maybe_compact(self) -> None:
+        size = self._file.tell()
+        if size >= self.compact_min_bytes and size > self.compact_ratio * (self._live_bytes + len(_MAGIC)):
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite only the live entries; the new log replaces the old one atomically."""
+        tmp_path = self.path + ".compact"
+        with open(tmp_path, "wb") as f:
+            f.write(_MAGIC)
+            for key, value in self._data.items():
+                f.write(self._encode(key, value))
+            f.flush()
+            os.fsync(f.fileno())
+        self._file.close()
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "ab")
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def close(self) -> None:
+        """Release this holder's reference; the log file is closed once every holder has closed it."""
+        with _open_stores_lock:
+            self._refs -= 1
+            if self._refs > 0:
+                return
+            if _open_stores.get(os.path.abspath(self.path)) is self:
+                del _open_stores[os.path.abspath(self.path)]
+        if not self._file.closed:
+            self._file.close()
+
+
+def open_store(path: str, **kwargs) -> AppendOnlyStore:
+    """
+    Shared AppendOnlyStore for path. Separate instances on the same log would each hold their own
+    replayed index and file handle, so a clear() or compact() through one would leave the others
+    appending to an unlinked file; every caller in the process gets the same instance instead.
+    Each call must be paired with close().
+    """
+    key = os.path.abspath(path)
+    with _open_stores_lock:
+        store = _open_stores.get(key)
+        if store is None or store.closed:
+            store = AppendOnlyStore(key, **kwargs)
+            _open_stores[key] = store
+        else:
+            store._refs += 1
+        return store
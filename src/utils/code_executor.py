@@ -6,6 +6,7 @@ import sys
 import ast
 import traceback
 import io
+import warnings
 from typing import Dict, Any, List, Optional, Tuple
 from contextlib import redirect_stdout, redirect_stderr
 from IPython.core.interactiveshell import InteractiveShell
@@ -32,13 +33,37 @@ class CodeExecutor:
         'typing', 'dataclasses', 'enum', 'sqlite3', 'seaborn', 'plotly.express'
     }
     
+    # Shell names and rcParams produced by the one-time setup (see _setup_environment)
+    _baseline_ns: Optional[Dict[str, Any]] = None
+    _baseline_rc: Optional[Dict[str, Any]] = None
+
     def __init__(self, output_dir: str = "outputs"):
         self.output_dir = os.path.abspath(output_dir)
         os.makedirs(self.output_dir, exist_ok=True)
         self.shell = InteractiveShell.instance()
-        self._setup_chinese_font()
-        self._setup_common_imports()
+        self._setup_environment()
         self.image_counter = 0
+
+    def _setup_environment(self):
+        """
+        Configure fonts and preload libraries in the shell.
+
+        The setup cells only run once per process (the shell is a singleton); later executors and
+        resets restore the resulting names and rcParams from a snapshot, which takes milliseconds.
+        """
+        if CodeExecutor._baseline_ns is None:
+            before = set(self.shell.user_ns)
+            self._setup_chinese_font()
+            self._setup_common_imports()
+            CodeExecutor._baseline_ns = {
+                k: v for k, v in self.shell.user_ns.items() if k not in before and not k.startswith('_')
+            }
+            CodeExecutor._baseline_rc = {k: v for k, v in matplotlib.rcParams.items() if k != 'backend'}
+        else:
+            self.shell.user_ns.update(CodeExecutor._baseline_ns)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                matplotlib.rcParams.update(CodeExecutor._baseline_rc)
         
     def _setup_chinese_font(self):
         """Configure matplotlib font settings."""
@@ -270,8 +295,7 @@ from IPython.display import display
     def reset_environment(self):
         """Reset the execution environment to its initial state."""
         self.shell.reset()
-        self._setup_common_imports()
-        self._setup_chinese_font()
+        self._setup_environment()
         plt.close('all')
         self.image_counter = 0
     
@@ -5,13 +5,78 @@ import os
 import dill  # Use dill instead of pickle for more robust serialization
 import traceback
 import uuid
+import copy
 import inspect
 import importlib
 import types
-from contextlib import redirect_stdout, redirect_stderr
-from typing import Dict, Any, List, Tuple
+import threading
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 
+# (stdout, stderr) buffers of the execution running in the current thread / task, if any
+_capture_target: ContextVar[Optional[Tuple[io.StringIO, io.StringIO]]] = ContextVar('executor_capture', default=None)
+# Event loop awaiting the execution that runs in the current thread. Helpers called from executor
+# code (call_tool, ...) submit their coroutines to it instead of starting an event loop per call.
+_caller_loop: ContextVar[Optional[asyncio.AbstractEventLoop]] = ContextVar('executor_caller_loop', default=None)
+_install_lock = threading.Lock()
+
+
+def get_caller_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """Event loop that started the execution running in this thread, or None outside executions."""
+    return _caller_loop.get()
+
+
+class _RoutedStream(io.TextIOBase):
+    """
+    Stand-in for sys.stdout/sys.stderr that sends writes to the buffer of the execution running in
+    the current context, and everything else to the original stream. Unlike redirect_stdout, which
+    swaps the process-wide stream, concurrent executions never see each other's output.
+    """
+
+    def __init__(self, fallback, index: int):
+        self._fallback = fallback
+        self._index = index
+
+    def _target(self):
+        buffers = _capture_target.get()
+        return buffers[self._index] if buffers is not None else self._fallback
+
+    def write(self, s):
+        return self._target().write(s)
+
+    def writelines(self, lines):
+        self._target().writelines(lines)
+
+    def flush(self):
+        target = self._target()
+        if target is not None:
+            target.flush()
+
+    def isatty(self):
+        return _capture_target.get() is None and self._fallback.isatty()
+
+    def fileno(self):
+        return self._fallback.fileno()
+
+    @property
+    def encoding(self):
+        return getattr(self._fallback, 'encoding', 'utf-8')
+
+    def __getattr__(self, name):
+        return getattr(self._fallback, name)
+
+
+def _install_routed_streams():
+    """Put the routing proxies in place (again, if something replaced sys.stdout/sys.stderr since)."""
+    with _install_lock:
+        if not isinstance(sys.stdout, _RoutedStream):
+            sys.stdout = _RoutedStream(sys.stdout, 0)
+        if not isinstance(sys.stderr, _RoutedStream):
+            sys.stderr = _RoutedStream(sys.stderr, 1)
+
+
 class AsyncCodeExecutor:
     """
     Lightweight Python sandbox capable of executing LLM-generated code.
@@ -71,6 +136,32 @@ class AsyncCodeExecutor:
         return context
 
 
+    def reset_environment(self):
+        """
+        Reset the namespace to a clean state. The libraries are already imported, so this is cheap.
+        """
+        self.globals = self.create_clean_globals()
+
+    def fork(self) -> 'AsyncCodeExecutor':
+        """
+        Child executor whose namespace starts as a copy of this one, for work that must not disturb it.
+
+        The dict is copied, so rebinding a name in the child never reaches the parent; mutable data
+        objects (DataFrames, arrays, lists, dicts, sets) are copied too, so in-place edits stay local.
+        Modules, functions and other objects are shared.
+        """
+        child = AsyncCodeExecutor.__new__(AsyncCodeExecutor)
+        child.working_dir = self.working_dir
+        child.session_id = str(uuid.uuid4())
+        child.globals = {}
+        for name, value in self.globals.items():
+            if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+                value = value.copy()
+            elif isinstance(value, (list, dict, set)):
+                value = copy.copy(value)
+            child.globals[name] = value
+        return child
+
     def set_variable(self, name: str, value: Any):
         """
         Inject an external variable or function into the executor's global scope.
@@ -256,42 +347,54 @@ class AsyncCodeExecutor:
         remains responsive. If the code defines `async def async_main():`, run it
         after the initial exec to support awaitable workflows.
 
-        Returns {stdout: str, stderr: str, error: bool}.
+        Returns {stdout: str, stderr: str, error: bool}, plus out_of_memory=True when the code raised
+        MemoryError or a subclass (e.g. numpy's _ArrayMemoryError), whatever the traceback says.
         """
         stdout_capture = io.StringIO()
         stderr_capture = io.StringIO()
         has_error = False
+        out_of_memory = False
+        
+        _install_routed_streams()
         
+        loop = asyncio.get_running_loop()
+
         # Wrap exec so it can run inside a thread
         def sync_exec():
-            nonlocal has_error
+            nonlocal has_error, out_of_memory
+            # Route this thread's stdout/stderr to the buffers (pool threads are reused, so reset after)
+            token = _capture_target.set((stdout_capture, stderr_capture))
+            loop_token = _caller_loop.set(loop)
             try:
-                # Redirect stdout/stderr
-                with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
-                    # Execute code within the custom global scope
-                    exec(code, self.globals)
-            except Exception:
+                # Execute code within the custom global scope
+                exec(code, self.globals)
+            except Exception as e:
                 # Capture exec-level exceptions
                 has_error = True
+                out_of_memory = isinstance(e, MemoryError)
                 stderr_capture.write(traceback.format_exc())
+            finally:
+                _caller_loop.reset(loop_token)
+                _capture_target.reset(token)
 
-        loop = asyncio.get_running_loop()
         await loop.run_in_executor(None, sync_exec)
         
         # Run user-defined async entry points if present
         if 'async_main' in self.globals and \
            asyncio.iscoroutinefunction(self.globals['async_main']):
             
+            # Capture within this task's context only; other tasks on the loop keep their own output
+            token = _capture_target.set((stdout_capture, stderr_capture))
             try:
-                # Redirect stdout/stderr as well
-                with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
-                    # Await the user coroutine
-                    await self.globals['async_main']()
-            except Exception:
+                # Await the user coroutine
+                await self.globals['async_main']()
+            except Exception as e:
                 # Capture async execution errors
                 has_error = True
+                out_of_memory = isinstance(e, MemoryError)
                 stderr_capture.write(traceback.format_exc())
             finally:
+                _capture_target.reset(token)
                 # Remove the coroutine to avoid reruns
                 del self.globals['async_main']
         
@@ -299,9 +402,12 @@ class AsyncCodeExecutor:
         stderr = stderr_capture.getvalue()
         if stdout == "":
             stdout = 'Run completed with no output.'
-        return {
+        result = {
             'stdout': stdout,
             'stderr': stderr,
             'error': has_error
         }
+        if out_of_memory:
+            result['out_of_memory'] = True
+        return result
 
@@ -0,0 +1,561 @@
+import asyncio
+import atexit
+import gc
+import inspect
+import os
+import multiprocessing
+import sys
+import signal
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+
+import dill
+
+try:
+    import resource
+except ImportError:  # Windows: wall-time budget only
+    resource = None
+
+from src.utils.code_executor_async import AsyncCodeExecutor, _caller_loop
+
+
+def _dumps(obj: Any) -> bytes:
+    return dill.dumps(obj)
+
+
+def _loads(raw: bytes) -> Any:
+    return dill.loads(raw)
+
+
+# Imported once by the forkserver; every worker forked from it starts with these already loaded.
+_PRELOAD_MODULES = ['src.utils.code_executor_process', 'pandas', 'numpy', 'matplotlib.pyplot', 'seaborn']
+_mp_ctx = None
+
+
+def _mp_context():
+    """
+    forkserver where available: workers are forked from a server process that has already
+    imported pandas/numpy/matplotlib/seaborn, so they start in milliseconds without inheriting the
+    agent process's threads and sockets. spawn elsewhere.
+    """
+    global _mp_ctx
+    if _mp_ctx is None:
+        methods = multiprocessing.get_all_start_methods()
+        _mp_ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        if "forkserver" in methods:
+            _mp_ctx.set_forkserver_preload(_PRELOAD_MODULES)
+    return _mp_ctx
+
+
+def _warm_up():
+    """Finish the expensive one-time setup (font cache, seaborn style) before any code runs."""
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        from matplotlib import font_manager
+        font_path = "./font/kt_font.ttf"
+        if os.path.exists(font_path):
+            font_manager.fontManager.addfont(font_path)
+        import seaborn as sns
+        sns.set_style("whitegrid")
+    except ImportError:
+        pass
+
+
+class _RemoteCallable:
+    """
+    Stand-in for a function injected with set_variable. Calling it inside the worker runs the
+    real function in the agent process (where the tools, memory and LLM clients live) and
+    returns its result.
+    """
+
+    def __init__(self, name: str, conn):
+        self.name = name
+        self._conn = conn
+
+    def __call__(self, *args, **kwargs):
+        self._conn.send_bytes(_dumps(('call', self.name, args, kwargs)))
+        kind, payload = _loads(self._conn.recv_bytes())
+        if kind == 'error':
+            raise payload
+        return payload
+
+    def __repr__(self):
+        return f"<function {self.name} (runs in agent process)>"
+
+    def __reduce__(self):
+        # Bound to this worker's pipe; executor state must not try to persist it.
+        raise TypeError(f"{self.name} is provided by the agent process and cannot be pickled")
+
+
+class _AsyncRemoteCallable(_RemoteCallable):
+    """Stand-in for an injected coroutine function, so executor code can `await` it as usual."""
+
+    async def __call__(self, *args, **kwargs):
+        # The worker only ever runs one execution, so waiting on the pipe here blocks nobody else
+        return super().__call__(*args, **kwargs)
+
+
+def _vm_bytes() -> int:
+    """Current address-space size of this process (Linux), or 0 when unknown."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _run_with_limits(executor: AsyncCodeExecutor, code: str, cpu_seconds: Optional[float], memory_mb: Optional[float]) -> dict:
+    """
+    Execute under temporary rlimits. RLIMIT_CPU kills the worker with SIGXCPU once the run has used
+    cpu_seconds; RLIMIT_AS makes allocations beyond memory_mb (on top of what the worker already
+    maps) fail with MemoryError. Both are restored afterwards.
+    """
+    saved = {}
+    if resource is not None:
+        if cpu_seconds:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            used = usage.ru_utime + usage.ru_stime
+            saved[resource.RLIMIT_CPU] = resource.getrlimit(resource.RLIMIT_CPU)
+            resource.setrlimit(resource.RLIMIT_CPU, (int(used + cpu_seconds) + 1, saved[resource.RLIMIT_CPU][1]))
+        if memory_mb and _vm_bytes():
+            saved[resource.RLIMIT_AS] = resource.getrlimit(resource.RLIMIT_AS)
+            resource.setrlimit(resource.RLIMIT_AS, (_vm_bytes() + int(memory_mb * 1024 * 1024), saved[resource.RLIMIT_AS][1]))
+    try:
+        return asyncio.run(executor.execute(code))
+    finally:
+        for limit, value in saved.items():
+            resource.setrlimit(limit, value)
+
+
+def _worker_main(conn):
+    """Request loop of an executor worker process; owns one AsyncCodeExecutor namespace."""
+    _warm_up()
+    executor: Optional[AsyncCodeExecutor] = None
+    while True:
+        try:
+            request = _loads(conn.recv_bytes())
+        except (EOFError, OSError):
+            return
+        op, args = request[0], request[1:]
+        try:
+            if op == 'init':
+                executor = AsyncCodeExecutor(args[0])
+                result = None
+            elif op == 'set':
+                name, payload = args
+                executor.set_variable(name, _loads(payload))
+                result = None
+            elif op == 'set_remote':
+                name, is_async = args
+                proxy_cls = _AsyncRemoteCallable if is_async else _RemoteCallable
+                executor.set_variable(name, proxy_cls(name, conn))
+                result = None
+            elif op == 'get':
+                try:
+                    result = _dumps(executor.get_variable(args[0]))
+                except Exception:
+                    result = _dumps(None)
+            elif op == 'execute':
+                result = _run_with_limits(executor, *args)
+            elif op == 'save_state':
+                result = executor.save_state()
+            elif op == 'load_state':
+                executor.load_state(args[0])
+                result = None
+            elif op == 'env_info':
+                result = executor.get_environment_info()
+            elif op == 'reset':
+                # Drop the namespace so the worker can be handed to another agent
+                executor = None
+                plt = sys.modules.get('matplotlib.pyplot')
+                if plt is not None:
+                    plt.close('all')
+                gc.collect()
+                result = None
+            elif op == 'close':
+                conn.send_bytes(_dumps(('done', None)))
+                return
+            else:
+                raise ValueError(f"Unknown executor request: {op}")
+            reply = ('done', result)
+        except Exception as e:
+            reply = ('failed', f"{type(e).__name__}: {e}\n{traceback.format_exc()}")
+        conn.send_bytes(_dumps(reply))
+
+
+class BudgetExceeded(Exception):
+    """An execution ran past one of its budgets; kind is "wall_time", "cpu_time" or "memory"."""
+
+    def __init__(self, kind: str, message: str):
+        super().__init__(message)
+        self.kind = kind
+
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.uses = 0
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def stop(self):
+        try:
+            if self.alive():
+                self.conn.send_bytes(_dumps(('close',)))
+                self.process.join(timeout=2)
+        except Exception:
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class ExecutorWorkerPool:
+    """
+    Warm pool of executor worker processes.
+
+    Idle workers are started ahead of time (in the background), so handing one to an agent only
+    costs a pipe round-trip. Released workers have their namespace dropped and go back to the pool;
+    a worker is retired after max_uses agents so state leaking between agents stays bounded.
+    """
+
+    def __init__(self, size: int = 2, max_uses: int = 20):
+        self.size = size
+        self.max_uses = max_uses
+        self._idle = []
+        self._lock = threading.Lock()
+        self._refilling = False
+        self._refill()
+
+    def _start(self) -> _Worker:
+        parent_conn, child_conn = _mp_context().Pipe(duplex=True)
+        process = _mp_context().Process(target=_worker_main, args=(child_conn,), daemon=True)
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _refill(self):
+        with self._lock:
+            if self._refilling or len(self._idle) >= self.size:
+                return
+            self._refilling = True
+
+        def run():
+            try:
+                while True:
+                    with self._lock:
+                        if len(self._idle) >= self.size:
+                            return
+                    worker = self._start()
+                    with self._lock:
+                        self._idle.append(worker)
+            finally:
+                with self._lock:
+                    self._refilling = False
+
+        threading.Thread(target=run, name="executor-pool-refill", daemon=True).start()
+
+    def acquire(self) -> _Worker:
+        worker = None
+        with self._lock:
+            while self._idle and worker is None:
+                candidate = self._idle.pop()
+                if candidate.alive():
+                    worker = candidate
+        if worker is None:
+            worker = self._start()
+        worker.uses += 1
+        self._refill()
+        return worker
+
+    def release(self, worker: _Worker):
+        if not worker.alive() or worker.uses >= self.max_uses:
+            worker.stop()
+            self._refill()
+            return
+        try:
+            worker.conn.send_bytes(_dumps(('reset',)))
+            kind, _ = _loads(worker.conn.recv_bytes())
+        except Exception:
+            kind = 'failed'
+        with self._lock:
+            keep = kind == 'done' and len(self._idle) < self.size
+            if keep:
+                self._idle.append(worker)
+        if not keep:
+            worker.stop()
+
+    def shutdown(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self.size = 0
+        for worker in idle:
+            worker.stop()
+
+
+_pool: Optional[ExecutorWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool(size: Optional[int] = None) -> ExecutorWorkerPool:
+    """Process-wide worker pool; the first call (or an explicit size) sets how many idle workers are kept."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExecutorWorkerPool(size=2 if size is None else size)
+            atexit.register(_pool.shutdown)
+        elif size is not None and size != _pool.size:
+            _pool.size = size
+            _pool._refill()
+    return _pool
+
+
+class ProcessCodeExecutor:
+    """
+    AsyncCodeExecutor backend that runs code in a dedicated worker process.
+
+    Each executor takes a warm worker from the pool and keeps it for its lifetime; the worker holds
+    the namespace, so CPU-heavy pandas and matplotlib work from concurrent agents runs on separate
+    cores instead of sharing the agent process's GIL and event loop. Plain values passed to set_variable are copied into the worker;
+    callables stay in the agent process and are invoked over the pipe. If the worker dies, the
+    next call starts a fresh one and re-injects the variables set so far.
+    """
+
+    def __init__(
+        self,
+        working_dir: str,
+        pool: Optional[ExecutorWorkerPool] = None,
+        timeout: Optional[float] = None,
+        cpu_seconds: Optional[float] = None,
+        memory_mb: Optional[float] = None,
+    ):
+        self.working_dir = working_dir
+        # Per-execution budgets (None = unlimited)
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        os.makedirs(self.working_dir, exist_ok=True)
+        self._callables: Dict[str, Any] = {}
+        self._values: Dict[str, bytes] = {}
+        self._pool = pool or get_worker_pool()
+        self._worker: Optional[_Worker] = None
+        # Loop of the execution in progress; callbacks from the worker run their coroutines on it
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._conn = None
+        # Waiting on the pipe happens here so the event loop stays free during long executions.
+        self._io_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="executor-io")
+        self._lock = threading.RLock()
+        self._start_worker()
+
+    # ----- worker lifecycle -----
+    def _start_worker(self):
+        self._worker = self._pool.acquire()
+        self._conn = self._worker.conn
+        self._init_namespace()
+
+    def _init_namespace(self):
+        self._request('init', self.working_dir)
+        for name, payload in self._values.items():
+            self._request('set', name, payload)
+        for name, func in self._callables.items():
+            self._request('set_remote', name, inspect.iscoroutinefunction(func))
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.alive():
+            if self._worker is not None:
+                self._worker.stop()
+            self._start_worker()
+
+    def reset_environment(self):
+        """Start over with a clean namespace (injected variables are kept)."""
+        self._ensure_worker()
+        self._init_namespace()
+
+    def fork(self) -> 'ProcessCodeExecutor':
+        """
+        Child executor on another pooled worker, seeded with this namespace's saved state and the
+        same injected variables. Changes in either one never reach the other.
+        """
+        child = ProcessCodeExecutor.__new__(ProcessCodeExecutor)
+        child.working_dir = self.working_dir
+        child.timeout, child.cpu_seconds, child.memory_mb = self.timeout, self.cpu_seconds, self.memory_mb
+        child._callables = dict(self._callables)
+        child._values = dict(self._values)
+        child._pool = self._pool
+        child._io_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="executor-io")
+        child._lock = threading.RLock()
+        child._worker = None
+        child._loop = None
+        child._start_worker()
+        child.load_state(self.save_state())
+        return child
+
+    def close(self):
+        """Hand the worker back to the pool."""
+        with self._lock:
+            if self._worker is not None:
+                self._pool.release(self._worker)
+            self._worker = None
+            self._conn = None
+        self._io_thread.shutdown(wait=False)
+
+    def __del__(self):
+        try:
+            if self._worker is not None:
+                self._pool.release(self._worker)
+        except Exception:
+            pass
+
+    # ----- pipe protocol -----
+    def _serve(self, deadline: Optional[float] = None) -> Tuple[str, Any]:
+        """Answer callbacks from the worker until it replies to the pending request."""
+        while True:
+            if deadline is not None and not self._conn.poll(max(0.0, deadline - time.monotonic())):
+                raise BudgetExceeded('wall_time', f"Execution exceeded the {self.timeout:g}s wall-time budget and was stopped.")
+            kind, *payload = _loads(self._conn.recv_bytes())
+            if kind != 'call':
+                return kind, payload[0]
+            name, args, kwargs = payload
+            loop_token = _caller_loop.set(self._loop)
+            try:
+                result = self._callables[name](*args, **kwargs)
+                if inspect.iscoroutine(result):
+                    result = asyncio.run_coroutine_threadsafe(result, self._loop).result()
+                raw = _dumps(('result', result))
+            except Exception as e:
+                try:
+                    raw = _dumps(('error', e))
+                except Exception:
+                    raw = _dumps(('error', RuntimeError(f"{type(e).__name__}: {e}")))
+            finally:
+                _caller_loop.reset(loop_token)
+            self._conn.send_bytes(raw)
+
+    def _request(self, op: str, *args, deadline: Optional[float] = None) -> Any:
+        with self._lock:
+            self._conn.send_bytes(_dumps((op, *args)))
+            kind, result = self._serve(deadline)
+        if kind == 'failed':
+            raise RuntimeError(f"Executor worker failed on '{op}': {result}")
+        return result
+
+    def _call(self, op: str, *args) -> Any:
+        self._ensure_worker()
+        return self._request(op, *args)
+
+    # ----- AsyncCodeExecutor interface -----
+    def set_variable(self, name: str, value: Any):
+        """
+        Inject a variable into the worker namespace. Callables keep running in this process.
+        """
+        if callable(value) and not isinstance(value, type):
+            self._callables[name] = value
+            self._values.pop(name, None)
+            self._call('set_remote', name, inspect.iscoroutinefunction(value))
+            return
+        try:
+            payload = _dumps(value)
+        except Exception as e:
+            raise TypeError(f"Cannot send variable '{name}' to the executor process: {e}")
+        self._values[name] = payload
+        self._callables.pop(name, None)
+        self._call('set', name, payload)
+
+    def get_variable(self, name: str) -> Any:
+        if name in self._callables:
+            return self._callables[name]
+        return _loads(self._call('get', name))
+
+    def save_state(self) -> bytes:
+        return self._call('save_state')
+
+    def load_state(self, state: bytes):
+        self._call('load_state', state)
+        # load_state rebuilds the namespace; put the injected variables back
+        for name, payload in self._values.items():
+            self._call('set', name, payload)
+        for name, func in self._callables.items():
+            self._call('set_remote', name, inspect.iscoroutinefunction(func))
+
+    def get_environment_info(self) -> str:
+        return self._call('env_info')
+
+    def _execute_blocking(self, code: str) -> dict:
+        self._ensure_worker()
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        try:
+            result = self._request('execute', code, self.cpu_seconds, self.memory_mb, deadline=deadline)
+        except BudgetExceeded:
+            # Real cancellation: the worker is killed and replaced on the next call
+            self._worker.process.kill()
+            self._worker.process.join(timeout=5)
+            raise
+        except (EOFError, OSError):
+            self._worker.process.join(timeout=5)
+            if self.cpu_seconds and self._worker.process.exitcode == -getattr(signal, 'SIGXCPU', 0):
+                raise BudgetExceeded('cpu_time', f"Execution exceeded the {self.cpu_seconds:g}s CPU-time budget and was stopped.")
+            raise
+        # Flagged by the worker for MemoryError and subclasses (numpy/pandas raise _ArrayMemoryError)
+        if result.pop('out_of_memory', False) and self.memory_mb:
+            result['budget_exceeded'] = 'memory'
+            result['stderr'] += f"\nExecution exceeded the {self.memory_mb:g} MB memory budget."
+        return result
+
+    async def execute(self, code: str) -> dict:
+        """
+        Execute code in the worker process. Returns {stdout: str, stderr: str, error: bool}.
+
+        A run that exceeds a budget is cancelled and reported with error=True and
+        budget_exceeded set to "wall_time", "cpu_time" or "memory". Variables defined by earlier
+        code are lost when the worker has to be stopped; injected variables are restored.
+        """
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        try:
+            return await loop.run_in_executor(self._io_thread, self._execute_blocking, code)
+        except BudgetExceeded as e:
+            return {
+                'stdout': '',
+                'stderr': f"{e} Variables defined by earlier code were lost; split the work into smaller steps.",
+                'error': True,
+                'budget_exceeded': e.kind,
+            }
+        except (EOFError, OSError) as e:
+            # The worker died mid-run (e.g. killed by the OS); the next call starts a new one.
+            return {
+                'stdout': '',
+                'stderr': f"Executor process exited unexpectedly: {type(e).__name__}: {e}. Variables defined by earlier code were lost.",
+                'error': True,
+            }
+
+
+def create_code_executor(
+    working_dir: str,
+    backend: str = "thread",
+    pool_size: Optional[int] = None,
+    timeout: Optional[float] = None,
+    cpu_seconds: Optional[float] = None,
+    memory_mb: Optional[float] = None,
+):
+    """
+    Executor for agent code: "thread" (in-process AsyncCodeExecutor) or "process" (pooled workers).
+    Execution budgets need the process backend, since a thread cannot be stopped.
+    """
+    if backend == "process":
+        return ProcessCodeExecutor(
+            working_dir,
+            pool=get_worker_pool(pool_size),
+            timeout=timeout,
+            cpu_seconds=cpu_seconds,
+            memory_mb=memory_mb,
+        )
+    if backend != "thread":
+        raise ValueError(f"Unknown executor backend: {backend}")
+    return AsyncCodeExecutor(working_dir)
@@ -0,0 +1,10 @@
+# Single implementation shared with the RAG pipeline: src_rag/core/embedding_cache.py has no
+# package-relative imports, so it can be imported from the project root alongside src/.
+# Both trees therefore read and write the same SQLite schema.
+from src_rag.core.embedding_cache import (  # noqa: F401
+    DEFAULT_CACHE_PATH,
+    DEFAULT_MAX_MB,
+    EmbeddingCache,
+    provider_key,
+    text_digest,
+)
@@ -1,5 +1,7 @@
 import base64
 import re
+import numpy as np
+from typing import List, Tuple
 
 def image_to_base64(image_path: str) -> str:
     """Converts an image file to a base64 encoded string."""
@@ -25,4 +27,58 @@ def get_md_img(img_path: str, img_name: str, idx: int):
         title = prefixs[0]
         sources = ",".join(prefixs[1:])
         img_name = f'{title} (Data source: {sources})'
-    return f"""\n\n![Chart {idx}: {img_name}]({img_path})\n\n"""
\ No newline at end of file
+    return f"""\n\n![Chart {idx}: {img_name}]({img_path})\n\n"""
+
+
+# Vendored from src_rag/core/vector_index.py (the RAG tree is its own `src` package, so it cannot be
+# imported from here); change both copies together.
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest scores, best first, in O(N + k log k).
+
+    Candidates come from np.argpartition; only the k winners are sorted. Ties are broken
+    by the lower row index, including ties at the k-th boundary, so results are reproducible.
+    NaN scores rank as -inf.
+    """
+    scores = np.asarray(scores)
+    if scores.dtype.kind == "f" and np.isnan(scores).any():
+        scores = np.where(np.isnan(scores), -np.inf, scores)
+    n = scores.shape[0]
+    k = min(int(k), n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        kth_value = scores[np.argpartition(scores, n - k)[n - k :]].min()
+        above = np.flatnonzero(scores > kth_value)
+        ties = np.flatnonzero(scores == kth_value)[: k - above.size]
+        candidates = np.concatenate([above, ties])
+    else:
+        candidates = np.arange(n)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order]
+
+
+def greedy_assignment(scores: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Match rows to columns one-to-one, taking the highest remaining score first.
+
+    All pairs are ranked once with a single stable argsort, so the result is the global
+    greedy matching (ties go to the lower row, then the lower column). Returns
+    (row, col) pairs in row order; at most min(n_rows, n_cols) rows are matched.
+    """
+    scores = np.nan_to_num(np.asarray(scores, dtype=np.float64), nan=-np.inf)
+    if scores.ndim != 2 or scores.size == 0:
+        return []
+    n_rows, n_cols = scores.shape
+    row_used = np.zeros(n_rows, dtype=bool)
+    col_used = np.zeros(n_cols, dtype=bool)
+    pairs = []
+    for flat in np.argsort(-scores, axis=None, kind="stable"):
+        row, col = divmod(int(flat), n_cols)
+        if row_used[row] or col_used[col]:
+            continue
+        row_used[row] = col_used[col] = True
+        pairs.append((row, col))
+        if len(pairs) == min(n_rows, n_cols):
+            break
+    return sorted(pairs)
@@ -4,6 +4,9 @@ import json
 import numpy as np
 from tqdm import tqdm
 from typing import List, Tuple
+from src.utils.helper import top_k_indices
+from src.utils.embedding_cache import EmbeddingCache, provider_key
+from src.utils.append_store import open_store
 
 class IndexBuilder:
     def __init__(
@@ -16,60 +19,61 @@ class IndexBuilder:
         self.embedding_model_name = embedding_model
         self.save_file_path = os.path.join(working_dir, "embeddings", "collect_data_list.npz")
         self.cache_file_path = os.path.join(working_dir, "embeddings", "cache.json")
-        self.cache = {}
+        self.search_cache_path = os.path.join(working_dir, "embeddings", "search_cache.log")
         self.embeddings = []
-        # Load cache if it exists
-        self._load_cache()
+        # Embeddings live in the shared on-disk cache keyed by (endpoint, model, sha256(text)),
+        # so every agent working directory and the RAG pipeline reuse each other's vectors.
+        self.embedding_cache = EmbeddingCache.from_env()
+        self.cache_provider = provider_key(getattr(self.llm.client, "base_url", None), embedding_model)
+        # Search results go to an append-only log: a cache miss appends one record instead of
+        # rewriting the whole cache file. Builders on the same working directory share one store.
+        self.search_cache = open_store(self.search_cache_path)
+        self._migrate_legacy_cache()
         # Load embeddings index if it exists
         self.load_index()
 
-    def _load_cache(self):
-        """Internal method to load the search and embeddings cache (with backward compatibility)."""
-        if os.path.exists(self.cache_file_path):
-            try:
-                with open(self.cache_file_path, "r", encoding="utf-8") as f:
-                    loaded = json.load(f)
-                # Backward compatibility: previously cache may have been a flat dict for search results
-                if isinstance(loaded, dict) and ("search" in loaded or "embeddings" in loaded):
-                    self.cache = loaded
-                elif isinstance(loaded, dict):
-                    # Migrate old flat search cache into new structured cache
-                    self.cache = {"search": loaded, "embeddings": {}}
-                else:
-                    self.cache = {"search": {}, "embeddings": {}}
-            except json.JSONDecodeError as e:
-                print(f"Warning: Could not load cache from {self.cache_file_path}. File might be corrupted: {e}")
-                self.cache = {"search": {}, "embeddings": {}} # Reset cache if loading fails
+    def _migrate_legacy_cache(self):
+        """Move entries from an older cache.json into the search log and the shared embedding cache."""
+        if not os.path.exists(self.cache_file_path):
+            return
+        try:
+            with open(self.cache_file_path, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Warning: Could not load legacy cache from {self.cache_file_path}: {e}")
+            loaded = {}
+        if not isinstance(loaded, dict):
+            loaded = {}
+        # Backward compatibility: the oldest cache files were a flat dict of search results
+        if "search" in loaded or "embeddings" in loaded:
+            search, legacy_embeddings = loaded.get("search") or {}, loaded.get("embeddings") or {}
         else:
-            print(f"No cache file found at {self.cache_file_path}. Starting with empty cache.")
-            self.cache = {"search": {}, "embeddings": {}}
+            search, legacy_embeddings = loaded, {}
+
+        if legacy_embeddings and self.embedding_cache is not None:
+            texts = [text for text, emb in legacy_embeddings.items() if emb]
+            self.embedding_cache.put_many(
+                self.cache_provider, self.llm.model_name, texts, [legacy_embeddings[text] for text in texts]
+            )
+        if search:
+            self.search_cache.update({q: r for q, r in search.items() if q not in self.search_cache})
+        os.replace(self.cache_file_path, self.cache_file_path + ".migrated")
 
-    def _save_cache(self):
-        """Internal method to save the search cache."""
-        os.makedirs(os.path.dirname(self.cache_file_path), exist_ok=True)
-        try:
-            with open(self.cache_file_path, "w", encoding="utf-8") as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=4) # Added indent for readability
-        except IOError as e:
-            print(f"Error: Could not save cache to {self.cache_file_path}: {e}")
-        
     async def _get_embeddings_batch(self, batch: List[str], n_retries: int = 3):
         """Helper method to get embeddings for a batch with retries and caching per-text."""
-        if not isinstance(self.cache, dict):
-            self.cache = {"search": {}, "embeddings": {}}
-        if "embeddings" not in self.cache or not isinstance(self.cache["embeddings"], dict):
-            self.cache["embeddings"] = {}
-
         # Prepare results aligned with input order
         results: List = [None] * len(batch)
         to_compute_indices: List[int] = []
         to_compute_texts: List[str] = []
 
         # Fill from cache if available
-        for idx, text in enumerate(batch):
-            cached = self.cache["embeddings"].get(text)
+        if self.embedding_cache is not None:
+            cached_list = self.embedding_cache.get_many(self.cache_provider, self.llm.model_name, batch)
+        else:
+            cached_list = [None] * len(batch)
+        for idx, (text, cached) in enumerate(zip(batch, cached_list)):
             if cached is not None:
-                results[idx] = cached
+                results[idx] = cached.tolist()
             else:
                 to_compute_indices.append(idx)
                 to_compute_texts.append(text)
@@ -78,11 +82,12 @@ class IndexBuilder:
         if not to_compute_texts:
             return results
 
-        # Compute missing embeddings with retries
+        # Compute missing embeddings with retries (repeated texts in a batch are sent once)
+        unique_texts = list(dict.fromkeys(to_compute_texts))
         response = []
         for attempt in range(n_retries):
             try:
-                response = await self.llm.generate_embeddings(to_compute_texts)
+                response = await self.llm.generate_embeddings(unique_texts)
                 break
             except Exception as e:
                 print(f"Error getting embeddings (attempt {attempt + 1}/{n_retries}): {e}")
@@ -94,23 +99,41 @@ class IndexBuilder:
         if not isinstance(response, list):
             response = []
 
-        # Map computed embeddings back to their positions and update cache
-        for offset, idx in enumerate(to_compute_indices):
+        # Map computed embeddings back to their positions
+        computed_by_text = {}
+        for offset, text in enumerate(unique_texts):
             if offset < len(response):
                 emb = response[offset]
-                # Ensure JSON serializable (convert numpy arrays to lists if any)
-                if isinstance(emb, np.ndarray):
-                    emb = emb.tolist()
-                results[idx] = emb
-                self.cache["embeddings"][batch[idx]] = emb
-            else:
-                results[idx] = []
-
-        # Persist cache updates
-        self._save_cache()
+                computed_by_text[text] = emb.tolist() if isinstance(emb, np.ndarray) else emb
+        for idx in to_compute_indices:
+            results[idx] = computed_by_text.get(batch[idx], [])
+
+        # Persist new vectors to the shared cache
+        if self.embedding_cache is not None and computed_by_text:
+            self.embedding_cache.put_many(
+                self.cache_provider,
+                self.llm.model_name,
+                list(computed_by_text),
+                list(computed_by_text.values()),
+            )
 
         return results
 
+    async def embed_texts(self, texts: List[str], batch_size: int = 32, n_retries: int = 2) -> np.ndarray:
+        """
+        Embed texts without touching the stored index; returns one row per text.
+        Texts whose embedding failed get an all-zero row.
+        """
+        vectors = []
+        for i in range(0, len(texts), batch_size):
+            vectors.extend(await self._get_embeddings_batch(texts[i : i + batch_size], n_retries))
+        dim = next((len(vec) for vec in vectors if len(vec)), 0)
+        matrix = np.zeros((len(texts), dim), dtype=np.float32)
+        for row, vec in enumerate(vectors):
+            if len(vec) == dim and dim:
+                matrix[row] = vec
+        return matrix
+
     async def build_index_from_analysis_result(self, analysis_result_list: List[dict], batch_size: int = 10, n_retries: int = 3):
         """Build embeddings index for a list of analysis results."""
         texts = [f"{item['report_title']}\n{item['report_content']}" for item in analysis_result_list]
@@ -126,8 +149,7 @@ class IndexBuilder:
         """Internal unified method to build the embeddings index."""
         self.embeddings = [] # Clear existing embeddings before building a new index
         # Clear search cache since index is being rebuilt - cached ids would be invalid
-        if isinstance(self.cache, dict) and "search" in self.cache:
-            self.cache["search"] = {}
+        self.search_cache.clear()
         
         for i in tqdm(range(0, len(texts), batch_size), desc="Building index"):
             batch = texts[i : i + batch_size]
@@ -168,19 +190,9 @@ class IndexBuilder:
             print("Warning: Embeddings index is empty. Cannot perform search.")
             return []
 
-        # Ensure structured cache
-        if not isinstance(self.cache, dict):
-            self.cache = {"search": {}, "embeddings": {}}
-        if "search" not in self.cache or not isinstance(self.cache["search"], dict):
-            # Backward compatibility: if flat, migrate
-            if isinstance(self.cache, dict):
-                flat = {k: v for k, v in self.cache.items() if k not in ("search", "embeddings")}
-                self.cache = {"search": flat, "embeddings": self.cache.get("embeddings", {})}
-            else:
-                self.cache = {"search": {}, "embeddings": {}}
-
-        if query in self.cache["search"]:
-            return self.cache["search"][query]
+        cached = self.search_cache.get(query)
+        if cached is not None:
+            return cached
 
         try:
             # Reuse the embedding cache via the batch helper
@@ -203,10 +215,14 @@ class IndexBuilder:
             print("Warning: No distances computed. Embeddings array might be empty.")
             return []
 
-        top_k_indices = np.argsort(distances)[::-1][:top_k]
+        distances = np.nan_to_num(distances, nan=-np.inf)
+        best_indices = top_k_indices(distances, top_k)
 
-        results = [{'id': int(i), 'score': float(distances[i])} for i in top_k_indices]
-        self.cache["search"][query] = results
-        self._save_cache() # Use the internal save method
+        results = [{'id': int(i), 'score': float(distances[i])} for i in best_indices]
+        self.search_cache.put(query, results)
 
         return results
+
+    def close(self):
+        """Release this builder's handle on the shared search log."""
+        self.search_cache.close()
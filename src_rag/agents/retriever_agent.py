@@ -2,24 +2,78 @@ from pathlib import Path
 from typing import Any, Dict, List
 import math
 
+import numpy as np
+
 from src.core.embeddings import EmbeddingClient
-from src.core.vector_index import VectorIndex
+from src.core.ivf_index import IVFIndex
+from src.core.quantized_index import QuantizedIndex
+from src.core.vector_index import VectorIndex, read_index_manifest
 
 
 class RetrieverAgent:
     def __init__(self, config: Dict[str, Any]) -> None:
         self.config = config
-        self.index = VectorIndex(Path(config["artifacts"]["rag_index_dir"]))
+        # Kept resident across questions; reloads only when the index files change.
+        artifacts = config["artifacts"]
+        index_dir = Path(artifacts["rag_index_dir"])
+        index_options = {
+            "mmap": bool(artifacts.get("rag_index_mmap", False)),
+            "block_rows": int(artifacts.get("rag_search_block_rows", 65536)),
+        }
+        index_type = artifacts.get("index_type", "flat")
+        storage = artifacts.get("index_storage", "float32")
+        # The build manifest, not the config, says which files are current; e.g. a compressed build
+        # without --keep-raw has no embeddings.npy for a flat float32 load.
+        manifest = read_index_manifest(index_dir)
+        if manifest is not None and (manifest["index_type"], manifest["storage"]) != (index_type, storage):
+            print(
+                f"Warning: {index_dir} was built as {manifest['index_type']} ({manifest['storage']}), but the "
+                f"config asks for {index_type} ({storage}); using the built index. Rebuild with "
+                "scripts/build_index.py to switch."
+            )
+            index_type, storage = manifest["index_type"], manifest["storage"]
+        if index_type == "ivf":
+            self.index: VectorIndex = IVFIndex(
+                index_dir,
+                nprobe=int(artifacts.get("ivf_nprobe", 8)),
+                **index_options,
+            )
+        elif storage != "float32":
+            self.index = QuantizedIndex(
+                index_dir,
+                rerank=int(artifacts.get("rerank_candidates", 0)),
+                **index_options,
+            )
+        else:
+            self.index = VectorIndex(index_dir, **index_options)
         self.embedder = EmbeddingClient()
 
     def retrieve(self, question: str, top_k: int) -> List[Dict[str, Any]]:
-        metadata, embeddings = self.index.load()
         query_vec = self.embedder.embed_query(question)
-        idxs, sims = self.index.search(query_vec, embeddings, top_k=top_k)
+        metadata, _ = self.index.ensure_loaded()
+        idxs, sims = self.index.query(query_vec, top_k=top_k)
+        return self._collect(metadata, idxs, sims, top_k)
+
+    def retrieve_many(self, questions: List[str], top_k: int) -> List[List[Dict[str, Any]]]:
+        """Embed all questions in one request batch and score them with a single blocked GEMM pass."""
+        if not questions:
+            return []
+        query_matrix = self.embedder.embed_texts(questions)
+        metadata, _ = self.index.ensure_loaded()
+        idx_matrix, sim_matrix = self.index.query_batch(query_matrix, top_k=top_k)
+        return [
+            self._collect(metadata, idxs, sims, top_k)
+            for idxs, sims in zip(idx_matrix, sim_matrix)
+        ]
+
+    @staticmethod
+    def _collect(
+        metadata: List[Dict[str, Any]], idxs: np.ndarray, sims: np.ndarray, top_k: int
+    ) -> List[Dict[str, Any]]:
         results: List[Dict[str, Any]] = []
-        for i in idxs:
-            score = float(sims[int(i)])
-            if not math.isfinite(score):
+        for i, sim in zip(idxs, sims):
+            score = float(sim)
+            if int(i) < 0 or not math.isfinite(score):
                 continue
             item = metadata[int(i)]
             results.append(
@@ -0,0 +1,158 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+from urllib.parse import urlparse
+
+import numpy as np
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "quantharbor" / "embeddings.sqlite"
+DEFAULT_MAX_MB = 2048
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    text_hash BLOB NOT NULL,
+    dim INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (provider, model, text_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+CREATE TABLE IF NOT EXISTS cache_stats (id INTEGER PRIMARY KEY CHECK (id = 0), total_bytes INTEGER NOT NULL);
+INSERT OR IGNORE INTO cache_stats (id, total_bytes) VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS embeddings_bytes_insert AFTER INSERT ON embeddings BEGIN
+    UPDATE cache_stats SET total_bytes = total_bytes + length(NEW.vector) WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS embeddings_bytes_delete AFTER DELETE ON embeddings BEGIN
+    UPDATE cache_stats SET total_bytes = total_bytes - length(OLD.vector) WHERE id = 0;
+END;
+"""
+
+
+def provider_key(base_url: Optional[str], fallback: str) -> str:
+    """Identify an embedding endpoint by host, so every client of the same API shares entries."""
+    host = urlparse(str(base_url)).hostname if base_url else None
+    return (host or fallback).lower()
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by (provider, model, sha256(text)), shared across processes.
+
+    Vectors are stored as raw float32 blobs in SQLite (WAL mode, so readers never block the writer).
+    Total blob size is kept in cache_stats by triggers. When it exceeds max_bytes, the least recently
+    used entries are evicted down to 90% of the limit.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_bytes: Optional[int] = None) -> None:
+        self.path = Path(path or os.getenv("EMBEDDING_CACHE_PATH") or DEFAULT_CACHE_PATH).expanduser()
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("EMBEDDING_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connect().executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> Optional["EmbeddingCache"]:
+        """The shared cache, or None when EMBEDDING_CACHE_PATH is set to "off"."""
+        if os.getenv("EMBEDDING_CACHE_PATH", "").strip().lower() in {"off", "none", "0", "false"}:
+            return None
+        return cls()
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads; keep one per thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            # INSERT OR REPLACE only fires the delete trigger (keeping total_bytes exact) with this on.
+            conn.execute("PRAGMA recursive_triggers=ON")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def get_many(self, provider: str, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Cached vectors aligned with texts (None for misses); hits are marked as recently used."""
+        digests = [text_digest(t) for t in texts]
+        found = {}
+        conn = self._connect()
+        unique = list(dict.fromkeys(digests))
+        for start in range(0, len(unique), 500):
+            part = unique[start : start + 500]
+            rows = conn.execute(
+                "SELECT text_hash, dim, vector FROM embeddings WHERE provider = ? AND model = ? "
+                f"AND text_hash IN ({','.join('?' * len(part))})",
+                (provider, model, *part),
+            ).fetchall()
+            for digest, dim, blob in rows:
+                found[bytes(digest)] = np.frombuffer(blob, dtype=np.float32, count=dim)
+        if found:
+            now = time.time_ns()
+            with self._transaction():
+                conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE provider = ? AND model = ? AND text_hash = ?",
+                    [(now, provider, model, d) for d in found],
+                )
+        return [found.get(d) for d in digests]
+
+    def put_many(self, provider: str, model: str, texts: Sequence[str], vectors: Sequence) -> None:
+        now = time.time_ns()
+        rows = []
+        for text, vec in zip(texts, vectors):
+            arr = np.asarray(vec, dtype=np.float32).ravel()
+            if arr.size == 0:
+                continue
+            rows.append((provider, model, text_digest(text), int(arr.size), arr.tobytes(), now))
+        if not rows:
+            return
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (provider, model, text_hash, dim, vector, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        if self.max_bytes and self.total_bytes() > self.max_bytes:
+            self.evict(int(self.max_bytes * 0.9))
+
+    def total_bytes(self) -> int:
+        return int(self._connect().execute("SELECT total_bytes FROM cache_stats WHERE id = 0").fetchone()[0])
+
+    def evict(self, target_bytes: int) -> None:
+        """Drop least recently used entries until the stored vectors fit in target_bytes."""
+        with self._transaction() as conn:
+            excess = self.total_bytes() - target_bytes
+            victims = []
+            rows = conn.execute(
+                "SELECT provider, model, text_hash, length(vector) FROM embeddings ORDER BY last_used"
+            )
+            for provider, model, digest, size in rows:
+                if excess <= 0:
+                    break
+                victims.append((provider, model, digest))
+                excess -= size
+            conn.executemany(
+                "DELETE FROM embeddings WHERE provider = ? AND model = ? AND text_hash = ?", victims
+            )
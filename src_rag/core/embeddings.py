@@ -1,15 +1,116 @@
+import asyncio
 import os
-from typing import List, Optional
+import random
+import re
+import threading
+import time
+from typing import Any, Coroutine, List, Optional
 
 import numpy as np
-from openai import OpenAI
+import openai
+from openai import AsyncOpenAI
+
+from src.core.embedding_cache import EmbeddingCache, provider_key
+
+
+def _env_number(name: str, default: float) -> float:
+    value = os.getenv(name, "")
+    return float(value) if value.strip() else default
+
+
+# CJK ideographs, kana, hangul and full-width punctuation: roughly one token per character.
+_CJK_CHARS = re.compile(r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]")
+
+
+def _estimate_tokens(texts: List[str]) -> int:
+    # ~1 token per CJK character and ~4 characters per token for everything else, so the TPM
+    # budget holds for the Chinese filings as well as for English text.
+    total = 0
+    for t in texts:
+        cjk = len(_CJK_CHARS.findall(t))
+        total += cjk + (len(t) - cjk) // 4 + 1
+    return total
+
+
+def _run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine to completion, also from code that is already inside an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    result: dict = {}
+
+    def runner() -> None:
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as exc:  # noqa: BLE001
+            result["error"] = exc
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+
+class RateBudget:
+    """
+    Requests-per-minute and tokens-per-minute token buckets shared by all in-flight batches.
+
+    Both buckets refill continuously and start full; a limit of 0 disables that bucket.
+    """
+
+    def __init__(self, rpm: float = 0, tpm: float = 0) -> None:
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = rpm
+        self._tokens = tpm
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60.0)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60.0)
+
+    async def acquire(self, tokens: int) -> None:
+        # A batch larger than the whole per-minute budget may still run once the bucket is full.
+        tokens = min(tokens, self.tpm) if self.tpm else tokens
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = 0.0
+                if self.rpm and self._requests < 1:
+                    wait = max(wait, (1 - self._requests) * 60.0 / self.rpm)
+                if self.tpm and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60.0 / self.tpm)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self.rpm:
+                self._requests -= 1
+            if self.tpm:
+                self._tokens -= tokens
 
 
 class EmbeddingClient:
-    def __init__(self, provider: Optional[str] = None) -> None:
+    def __init__(
+        self, provider: Optional[str] = None, cache: Optional[EmbeddingCache] = None, fallback: bool = True
+    ) -> None:
         self.provider = (provider or os.getenv("PRIMARY_PROVIDER", "openai")).lower()
+        # Index builds pin the provider: chunk hashes embed model_id(), so vectors from a fallback
+        # model would be stored (and later reused) under the wrong model.
+        self.fallback = fallback
+        # Shared on-disk cache (see EMBEDDING_CACHE_PATH); identical text is never embedded twice.
+        self.cache = cache if cache is not None else EmbeddingCache.from_env()
 
-    def _build_client(self, provider: str) -> tuple[OpenAI, str]:
+    @staticmethod
+    def _provider_settings(provider: str) -> tuple[str, str, str]:
         upper = provider.upper()
         api_key = os.getenv(f"{upper}_API_KEY", "")
         base_url = os.getenv(f"{upper}_BASE_URL", "")
@@ -18,28 +119,103 @@ class EmbeddingClient:
             raise ValueError(f"Missing {upper}_API_KEY.")
         if not model:
             raise ValueError(f"Missing {upper}_EMBED_MODEL.")
-        client = OpenAI(api_key=api_key, base_url=base_url or None)
+        return api_key, base_url, model
+
+    def _build_async_client(self, provider: str) -> tuple[AsyncOpenAI, str]:
+        api_key, base_url, model = self._provider_settings(provider)
+        # Retries are handled per batch below so backoff also respects the shared rate budget.
+        client = AsyncOpenAI(api_key=api_key, base_url=base_url or None, max_retries=0)
         return client, model
 
+    def model_id(self) -> str:
+        """
+        Provider-qualified name of the preferred provider's embedding model. Only guaranteed to name
+        the model that produced the vectors when fallback is disabled.
+        """
+        return f"{self.provider}:{os.getenv(f'{self.provider.upper()}_EMBED_MODEL', '')}"
+
     def embed_texts(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        return _run_sync(self.aembed_texts(texts, batch_size=batch_size))
+
+    async def aembed_texts(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Embed texts with up to {PROVIDER}_EMBED_CONCURRENCY batches in flight.
+
+        Requests are paced by {PROVIDER}_EMBED_RPM / {PROVIDER}_EMBED_TPM (0 = unlimited). A batch that
+        hits 429, 5xx or a connection error is retried on its own with exponential backoff, up to
+        {PROVIDER}_EMBED_MAX_RETRIES times; other errors fall through to the next provider unless the
+        client was created with fallback=False. Vectors are returned in input order.
+        """
         preferred = self.provider
         providers = [preferred]
-        if preferred != "openai":
+        if self.fallback and preferred != "openai":
             providers.append("openai")
 
         last_exc: Exception | None = None
         for p in providers:
             try:
-                client, model = self._build_client(p)
-                vectors: List[List[float]] = []
-                for i in range(0, len(texts), batch_size):
-                    batch = texts[i : i + batch_size]
-                    resp = client.embeddings.create(model=model, input=batch)
-                    vectors.extend(item.embedding for item in resp.data)
+                client, model = self._build_async_client(p)
+                upper = p.upper()
+                cache_provider = provider_key(str(client.base_url), p)
+                cached = self.cache.get_many(cache_provider, model, texts) if self.cache else [None] * len(texts)
+                missing = list(dict.fromkeys(t for t, vec in zip(texts, cached) if vec is None))
+                concurrency = max(1, int(_env_number(f"{upper}_EMBED_CONCURRENCY", 4)))
+                budget = RateBudget(
+                    rpm=_env_number(f"{upper}_EMBED_RPM", 0),
+                    tpm=_env_number(f"{upper}_EMBED_TPM", 0),
+                )
+                max_retries = int(_env_number(f"{upper}_EMBED_MAX_RETRIES", 6))
+                semaphore = asyncio.Semaphore(concurrency)
+                batches = [missing[i : i + batch_size] for i in range(0, len(missing), batch_size)]
+
+                async def run(batch: List[str]) -> List[List[float]]:
+                    async with semaphore:
+                        return await self._embed_batch(client, model, batch, budget, max_retries)
+
+                tasks = [asyncio.ensure_future(run(batch)) for batch in batches]
+                try:
+                    results = await asyncio.gather(*tasks)
+                except BaseException:
+                    # Stop the sibling batches before the shared client is closed under them.
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    raise
+                finally:
+                    await client.close()
+                fresh = [vec for batch_vectors in results for vec in batch_vectors]
+                if self.cache and fresh:
+                    self.cache.put_many(cache_provider, model, missing, fresh)
+                by_text = dict(zip(missing, fresh))
+                vectors = [vec if vec is not None else by_text[t] for t, vec in zip(texts, cached)]
                 return np.array(vectors, dtype=np.float32)
             except Exception as exc:  # noqa: BLE001
                 last_exc = exc
         raise RuntimeError(f"Embedding failed for providers {providers}: {last_exc}")
 
+    @staticmethod
+    async def _embed_batch(
+        client: AsyncOpenAI, model: str, batch: List[str], budget: RateBudget, max_retries: int
+    ) -> List[List[float]]:
+        tokens = _estimate_tokens(batch)
+        attempt = 0
+        while True:
+            await budget.acquire(tokens)
+            try:
+                resp = await client.embeddings.create(model=model, input=batch)
+                # Some compatible endpoints do not guarantee response order; "index" does.
+                return [item.embedding for item in sorted(resp.data, key=lambda d: d.index)]
+            except (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError) as exc:
+                if attempt >= max_retries:
+                    raise
+                delay = min(60.0, 2.0**attempt) * (0.5 + random.random())
+                headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+                try:
+                    delay = max(delay, float(headers.get("retry-after", 0)))
+                except ValueError:
+                    pass
+                attempt += 1
+                await asyncio.sleep(delay)
+
     def embed_query(self, query: str) -> np.ndarray:
         return self.embed_texts([query], batch_size=1)[0]
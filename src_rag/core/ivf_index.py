@@ -0,0 +1,208 @@
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.core.vector_index import VectorIndex, _unit_query, _unit_rows, top_k_indices
+
+
+def default_nlist(n_rows: int) -> int:
+    """Rule-of-thumb list count (~4 * sqrt(N)), clamped to the number of rows."""
+    return int(max(1, min(n_rows, round(4 * np.sqrt(max(n_rows, 1))))))
+
+
+def sample_unit_rows(embeddings: np.ndarray, sample_size: Optional[int], seed: int = 0) -> np.ndarray:
+    """
+    Normalized copy of at most sample_size random rows (all rows if None or fewer), read in row order
+    so a memmapped matrix is only touched where sampled.
+    """
+    n_rows = embeddings.shape[0]
+    if sample_size is None or n_rows <= sample_size:
+        return _unit_rows(embeddings[:])
+    rng = np.random.default_rng(seed)
+    return _unit_rows(embeddings[np.sort(rng.choice(n_rows, size=sample_size, replace=False))])
+
+
+def assign_clusters(
+    data: np.ndarray, centroids: np.ndarray, block_rows: int = 65536, normalize: bool = False
+) -> np.ndarray:
+    """
+    Nearest centroid (by inner product on unit vectors) for every row, computed block by block.
+    With normalize=True each block is normalized on the fly, so raw (e.g. memmapped) rows can be passed.
+    """
+    labels = np.empty(data.shape[0], dtype=np.int64)
+    for start in range(0, data.shape[0], block_rows):
+        block = data[start : start + block_rows]
+        sims = (_unit_rows(block) if normalize else block) @ centroids.T
+        labels[start : start + block_rows] = np.argmax(sims, axis=1)
+    return labels
+
+
+def train_kmeans(
+    data: np.ndarray,
+    n_clusters: int,
+    n_iter: int = 20,
+    sample_size: Optional[int] = 100_000,
+    seed: int = 0,
+    spherical: bool = True,
+) -> np.ndarray:
+    """
+    Lloyd's k-means in NumPy, trained on at most sample_size rows.
+
+    With spherical=True (the coarse quantizer case) rows are assumed unit-length and centroids are
+    re-normalized every iteration so assignment is by cosine similarity. Otherwise assignment is by
+    squared Euclidean distance. Empty clusters are re-seeded from random training rows.
+    """
+    rng = np.random.default_rng(seed)
+    data = np.asarray(data, dtype=np.float32)
+    if sample_size is not None and data.shape[0] > sample_size:
+        data = data[np.sort(rng.choice(data.shape[0], size=sample_size, replace=False))]
+    n_rows = data.shape[0]
+    n_clusters = int(max(1, min(n_clusters, n_rows)))
+    centroids = data[rng.choice(n_rows, size=n_clusters, replace=False)].copy()
+
+    for _ in range(max(1, n_iter)):
+        if spherical:
+            labels = assign_clusters(data, centroids)
+        else:
+            # argmin ||x - c||^2 == argmax (x.c - ||c||^2 / 2)
+            half_norms = 0.5 * np.einsum("ij,ij->i", centroids, centroids)
+            labels = np.argmax(data @ centroids.T - half_norms, axis=1)
+        counts = np.bincount(labels, minlength=n_clusters)
+        filled = counts > 0
+        # Sum members per cluster with one sort + reduceat (np.add.at is far slower).
+        order = np.argsort(labels, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[filled]
+        sums = np.add.reduceat(data[order].astype(np.float64), starts, axis=0)
+        centroids[filled] = (sums / counts[filled, None]).astype(np.float32)
+        empty = np.flatnonzero(~filled)
+        if empty.size:
+            centroids[empty] = data[rng.choice(n_rows, size=empty.size, replace=False)]
+        if spherical:
+            centroids = _unit_rows(centroids)
+    return centroids
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted-file index over the same metadata.jsonl/embeddings.npy as VectorIndex.
+
+    A spherical k-means coarse quantizer splits the rows into nlist posting lists (stored CSR-style
+    in ivf.npz). A query scores the centroids, then exact cosine only over the nprobe closest lists,
+    so the work per query scales with nprobe * N / nlist instead of N.
+    """
+
+    def __init__(
+        self,
+        index_dir: Path,
+        nprobe: int = 8,
+        mmap: bool = False,
+        block_rows: int = 65536,
+    ) -> None:
+        super().__init__(index_dir, mmap=mmap, block_rows=block_rows)
+        self.ivf_file = index_dir / "ivf.npz"
+        self.nprobe = max(1, int(nprobe))
+        self._centroids: Optional[np.ndarray] = None
+        self._list_offsets: Optional[np.ndarray] = None
+        self._list_ids: Optional[np.ndarray] = None
+
+    def save(
+        self,
+        metadata: List[Dict],
+        embeddings: np.ndarray,
+        nlist: Optional[int] = None,
+        n_iter: int = 20,
+        train_size: Optional[int] = 100_000,
+        seed: int = 0,
+    ) -> None:
+        super().save(metadata, embeddings)
+        self.train(embeddings, nlist=nlist, n_iter=n_iter, train_size=train_size, seed=seed)
+
+    def train(
+        self,
+        embeddings: np.ndarray,
+        nlist: Optional[int] = None,
+        n_iter: int = 20,
+        train_size: Optional[int] = 100_000,
+        seed: int = 0,
+    ) -> None:
+        """
+        Train the coarse quantizer and write the posting lists to ivf.npz.
+
+        k-means runs on a normalized sample of train_size rows and the assignment pass reads
+        embeddings block by block, so a memmapped matrix is never copied whole into memory.
+        """
+        nlist = default_nlist(embeddings.shape[0]) if not nlist else int(nlist)
+        sample = sample_unit_rows(embeddings, train_size, seed=seed)
+        centroids = train_kmeans(sample, nlist, n_iter=n_iter, sample_size=None, seed=seed)
+        labels = assign_clusters(embeddings, centroids, block_rows=self.block_rows, normalize=True)
+        # CSR layout: ids of list c are list_ids[list_offsets[c]:list_offsets[c + 1]].
+        list_ids = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=centroids.shape[0])
+        list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        np.savez(self.ivf_file, centroids=centroids, list_offsets=list_offsets, list_ids=list_ids)
+
+    def _file_signature(self) -> tuple:
+        if not self.ivf_file.exists():
+            raise FileNotFoundError(
+                f"Missing IVF lists at {self.ivf_file}. Rebuild with scripts/build_index.py --index-type ivf."
+            )
+        return super()._file_signature() + ((self.ivf_file.stat().st_mtime_ns, self.ivf_file.stat().st_size),)
+
+    def ensure_loaded(self) -> tuple[List[Dict], np.ndarray]:
+        signature = self._file_signature()
+        if self._centroids is None or signature != self._signature:
+            with np.load(self.ivf_file) as ivf:
+                self._centroids = ivf["centroids"]
+                self._list_offsets = ivf["list_offsets"]
+                self._list_ids = ivf["list_ids"]
+        metadata, matrix = super().ensure_loaded()
+        if self._list_ids.shape[0] != matrix.shape[0] or self._centroids.shape[1] != matrix.shape[1]:
+            raise ValueError(
+                f"IVF lists at {self.ivf_file} were trained on a different embeddings.npy "
+                f"({self._list_ids.shape[0]} rows) than the current one ({matrix.shape[0]} rows). "
+                "Rebuild with scripts/build_index.py --index-type ivf."
+            )
+        return metadata, matrix
+
+    def probe(self, q_unit: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        """Row ids held by the nprobe posting lists closest to a unit query."""
+        nprobe = min(self.nprobe if nprobe is None else max(1, int(nprobe)), self._centroids.shape[0])
+        lists = top_k_indices(self._centroids @ q_unit, nprobe)
+        return np.concatenate(
+            [self._list_ids[self._list_offsets[c] : self._list_offsets[c + 1]] for c in lists]
+        )
+
+    def query(
+        self, query_vec: np.ndarray, top_k: int, nprobe: Optional[int] = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Approximate top-k; returns (ids, scores) ranked by exact cosine within the probed lists."""
+        if self._centroids is None:
+            self.ensure_loaded()
+        q_unit = _unit_query(query_vec)
+        if q_unit is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        candidates = np.sort(self.probe(q_unit, nprobe))
+        rows = self._matrix[candidates]
+        if self.mmap:
+            rows = _unit_rows(rows)
+        sims = np.nan_to_num(rows @ q_unit, nan=-1.0, posinf=-1.0, neginf=-1.0)
+        local = top_k_indices(sims, top_k)
+        return candidates[local], sims[local]
+
+    def query_batch(
+        self, query_matrix: np.ndarray, top_k: int, nprobe: Optional[int] = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Batched form of query(); rows with fewer than top_k candidates are padded with id -1."""
+        if self._centroids is None:
+            self.ensure_loaded()
+        queries = np.atleast_2d(np.asarray(query_matrix))
+        k = min(int(top_k), self._matrix.shape[0])
+        best_ids = np.full((queries.shape[0], k), -1, dtype=np.int64)
+        best_scores = np.full((queries.shape[0], k), -1.0, dtype=np.float32)
+        for j, query_vec in enumerate(queries):
+            ids, scores = self.query(query_vec, k, nprobe=nprobe)
+            best_ids[j, : ids.size] = ids
+            best_scores[j, : ids.size] = scores
+        return best_ids, best_scores
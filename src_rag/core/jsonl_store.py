@@ -0,0 +1,63 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+
+def iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield one record per non-empty line; memory use is independent of file size."""
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_records(jsonl_path: Path, legacy_json_path: Optional[Path] = None) -> Iterator[Dict[str, Any]]:
+    """Stream records from jsonl_path, falling back to a legacy single-array JSON file."""
+    if jsonl_path.exists() or legacy_json_path is None or not legacy_json_path.exists():
+        yield from iter_jsonl(jsonl_path)
+        return
+    with legacy_json_path.open("r", encoding="utf-8") as f:
+        yield from json.load(f)
+
+
+class JsonlWriter:
+    """
+    Append records to a .jsonl file one line at a time.
+
+    Lines go to a sibling .tmp file that replaces the target only on a clean close, so readers never
+    see a half-written file and an interrupted run leaves the previous output untouched.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.tmp_path = path.with_name(path.name + ".tmp")
+        self.count = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = self.tmp_path.open("w", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._f.write(json.dumps(record, ensure_ascii=False))
+        self._f.write("\n")
+        self.count += 1
+
+    def write_all(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            self.write(record)
+
+    def close(self) -> None:
+        self._f.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        self._f.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,239 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.core.ivf_index import sample_unit_rows, train_kmeans
+from src.core.vector_index import VectorIndex, _unit_rows
+
+STORAGE_FORMATS = ("float16", "int8", "pq")
+
+
+def default_pq_subvectors(dim: int) -> int:
+    """About 8 dimensions per sub-quantizer (192 one-byte codes for 1536-d embeddings)."""
+    return max(1, dim // 8)
+
+
+class QuantizedIndex(VectorIndex):
+    """
+    Flat index whose vectors are stored compressed and scored without decompressing the matrix.
+
+    Rows are unit-normalized before encoding, so scores remain (approximate) cosine similarities:
+      - float16: half-precision vectors (2x smaller than float32).
+      - int8: per-dimension scalar quantization to one byte; x ~= offset + scale * code, so
+        q.x ~= q.offset + (q * scale).code (4x smaller than float32).
+      - pq: product quantization; each of m sub-vectors is replaced by the id of its nearest
+        k-means centroid and scored through an (m, 256) lookup table per query (~dim * 4 / m x smaller).
+    If the raw embeddings are kept next to the codes, the best `rerank` rows per query are re-scored exactly.
+    """
+
+    def __init__(
+        self,
+        index_dir: Path,
+        rerank: int = 0,
+        mmap: bool = False,
+        block_rows: int = 65536,
+    ) -> None:
+        super().__init__(index_dir, mmap=mmap, block_rows=block_rows)
+        self.manifest_file = index_dir / "quantization.json"
+        self.codes_file = index_dir / "codes.npy"
+        self.params_file = index_dir / "quant_params.npz"
+        self.rerank = max(0, int(rerank))
+        self._manifest: Optional[Dict[str, Any]] = None
+        self._params: Dict[str, np.ndarray] = {}
+        self._raw: Optional[np.ndarray] = None
+
+    def save(
+        self,
+        metadata: List[Dict],
+        embeddings: np.ndarray,
+        storage: str = "int8",
+        keep_raw: bool = False,
+        pq_subvectors: Optional[int] = None,
+        train_size: Optional[int] = 100_000,
+        seed: int = 0,
+    ) -> None:
+        if storage not in STORAGE_FORMATS:
+            raise ValueError(f"Unsupported storage format: {storage}. Expected one of {STORAGE_FORMATS}.")
+        self.write_metadata(metadata)
+        if keep_raw:
+            np.save(self.emb_file, embeddings)
+        self.encode(
+            embeddings,
+            storage=storage,
+            keep_raw=keep_raw,
+            pq_subvectors=pq_subvectors,
+            train_size=train_size,
+            seed=seed,
+        )
+
+    def encode(
+        self,
+        embeddings: np.ndarray,
+        storage: str = "int8",
+        keep_raw: bool = False,
+        pq_subvectors: Optional[int] = None,
+        train_size: Optional[int] = 100_000,
+        seed: int = 0,
+    ) -> None:
+        """
+        Write codes, parameters and manifest for embeddings (which may be a memmap of emb_file).
+
+        Rows are normalized and encoded block by block straight into a memory-mapped codes file;
+        int8 ranges come from a streaming min/max pass and PQ codebooks are trained on a sample, so
+        only block_rows raw rows (plus the training sample) are ever held in memory.
+        """
+        if storage not in STORAGE_FORMATS:
+            raise ValueError(f"Unsupported storage format: {storage}. Expected one of {STORAGE_FORMATS}.")
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        n_rows, dim = embeddings.shape
+        manifest: Dict[str, Any] = {"storage": storage, "rows": int(n_rows), "dim": int(dim)}
+        params: Dict[str, np.ndarray] = {}
+        if storage == "float16":
+            shape, dtype = (n_rows, dim), np.float16
+        elif storage == "int8":
+            lo = np.full(dim, np.inf, dtype=np.float32)
+            hi = np.full(dim, -np.inf, dtype=np.float32)
+            for _, unit in self._unit_blocks(embeddings):
+                lo = np.minimum(lo, unit.min(axis=0))
+                hi = np.maximum(hi, unit.max(axis=0))
+            scale = np.where(hi > lo, (hi - lo) / 255.0, 1.0).astype(np.float32)
+            params = {"scale": scale, "offset": lo}
+            shape, dtype = (n_rows, dim), np.uint8
+        else:
+            # ~64 training rows per centroid is plenty for 256-way sub-quantizers.
+            sample = sample_unit_rows(embeddings, min(train_size or n_rows, 64 * 256), seed=seed)
+            codebooks = self._train_pq(sample, pq_subvectors, seed)
+            params = {"codebooks": codebooks}
+            manifest["subvectors"] = int(codebooks.shape[0])
+            shape, dtype = (n_rows, codebooks.shape[0]), np.uint8
+
+        tmp_codes = self.codes_file.with_name(self.codes_file.name + ".tmp")
+        codes = np.lib.format.open_memmap(tmp_codes, mode="w+", dtype=dtype, shape=shape)
+        for start, unit in self._unit_blocks(embeddings):
+            if storage == "float16":
+                block_codes = unit.astype(np.float16)
+            elif storage == "int8":
+                block_codes = np.clip(np.rint((unit - params["offset"]) / params["scale"]), 0, 255)
+            else:
+                block_codes = self._pq_encode(unit, params["codebooks"])
+            codes[start : start + unit.shape[0]] = block_codes
+        codes.flush()
+        del codes
+        os.replace(tmp_codes, self.codes_file)
+        np.savez(self.params_file, **params)
+        with self.manifest_file.open("w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        if not keep_raw and self.emb_file.exists():
+            # A stale raw matrix from an earlier build would silently re-rank against the wrong rows.
+            self.emb_file.unlink()
+
+    def _unit_blocks(self, embeddings: np.ndarray) -> Iterator[tuple[int, np.ndarray]]:
+        for start in range(0, embeddings.shape[0], self.block_rows):
+            yield start, _unit_rows(embeddings[start : start + self.block_rows])
+
+    @staticmethod
+    def _train_pq(sample: np.ndarray, subvectors: Optional[int], seed: int) -> np.ndarray:
+        """(m, 256, dsub) codebooks trained on a sample of unit rows."""
+        n_rows, dim = sample.shape
+        m = int(subvectors or default_pq_subvectors(dim))
+        dsub = -(-dim // m)
+        # Zero-pad so every sub-vector has dsub dims; padding does not change inner products.
+        padded = np.zeros((n_rows, m * dsub), dtype=np.float32)
+        padded[:, :dim] = sample
+        ksub = min(256, n_rows)
+        codebooks = np.zeros((m, 256, dsub), dtype=np.float32)
+        for sub in range(m):
+            part = padded[:, sub * dsub : (sub + 1) * dsub]
+            centroids = train_kmeans(part, ksub, sample_size=None, seed=seed + sub, spherical=False)
+            codebooks[sub, : centroids.shape[0]] = centroids
+        return codebooks
+
+    @staticmethod
+    def _pq_encode(unit: np.ndarray, codebooks: np.ndarray) -> np.ndarray:
+        """Nearest codebook entry per sub-vector for a block of unit rows."""
+        m, ksub, dsub = codebooks.shape
+        padded = np.zeros((unit.shape[0], m * dsub), dtype=np.float32)
+        padded[:, : unit.shape[1]] = unit
+        codes = np.empty((unit.shape[0], m), dtype=np.uint8)
+        for sub in range(m):
+            centroids = codebooks[sub]
+            # Unused (all-zero) slots when the sample had < 256 rows must never win the argmax.
+            used = np.any(centroids, axis=1)
+            used[0] = True
+            half_norms = np.where(used, 0.5 * np.einsum("ij,ij->i", centroids, centroids), np.inf)
+            codes[:, sub] = np.argmax(padded[:, sub * dsub : (sub + 1) * dsub] @ centroids.T - half_norms, axis=1)
+        return codes
+
+    def load(self, mmap: bool = False) -> tuple[List[Dict], np.ndarray]:
+        metadata = list(self.iter_metadata())
+        codes = np.load(self.codes_file, mmap_mode="r" if mmap else None)
+        return metadata, codes
+
+    def _file_signature(self) -> tuple:
+        files = [self.metadata_path(), self.manifest_file, self.codes_file, self.params_file]
+        if self.emb_file.exists():
+            files.append(self.emb_file)
+        return tuple((st.st_mtime_ns, st.st_size) for st in (p.stat() for p in files))
+
+    def ensure_loaded(self) -> tuple[List[Dict], np.ndarray]:
+        """Return (metadata, codes), reloading the codes, parameters and manifest if any file changed."""
+        signature = self._file_signature()
+        if self._matrix is None or signature != self._signature:
+            with self.manifest_file.open("r", encoding="utf-8") as f:
+                self._manifest = json.load(f)
+            with np.load(self.params_file) as params:
+                self._params = {name: params[name] for name in params.files}
+            self._metadata, self._matrix = self.load(mmap=self.mmap)
+            # Only shortlisted rows are read for re-ranking, so the raw matrix is never pulled into RAM.
+            self._raw = np.load(self.emb_file, mmap_mode="r") if self.emb_file.exists() else None
+            self._signature = signature
+        return self._metadata, self._matrix
+
+    def _block_scores(self, start: int, stop: int, queries: np.ndarray) -> np.ndarray:
+        codes = np.asarray(self._matrix[start:stop])
+        storage = self._manifest["storage"]
+        if storage == "float16":
+            return queries @ codes.astype(np.float32).T
+        if storage == "int8":
+            scaled = queries * self._params["scale"]
+            return scaled @ codes.astype(np.float32).T + (queries @ self._params["offset"])[:, None]
+        codebooks = self._params["codebooks"]
+        m, _, dsub = codebooks.shape
+        padded = np.zeros((queries.shape[0], m * dsub), dtype=np.float32)
+        padded[:, : queries.shape[1]] = queries
+        # Asymmetric distance computation: lut[j, sub, c] = q_j[sub] . codebooks[sub, c].
+        lut = np.einsum("qsd,scd->qsc", padded.reshape(-1, m, dsub), codebooks)
+        flat_codes = codes.astype(np.intp) + np.arange(m, dtype=np.intp) * codebooks.shape[1]
+        lut = lut.reshape(queries.shape[0], -1)
+        return np.stack([np.take(lut[j], flat_codes).sum(axis=1) for j in range(queries.shape[0])])
+
+    def query(self, query_vec: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        ids, scores = self.query_batch(np.asarray(query_vec).reshape(1, -1), top_k)
+        found = ids[0] >= 0
+        return ids[0][found], scores[0][found]
+
+    def query_batch(self, query_matrix: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Score codes directly; with raw vectors present, re-rank max(top_k, rerank) candidates exactly."""
+        if self._matrix is None:
+            self.ensure_loaded()
+        queries = _unit_rows(np.atleast_2d(np.asarray(query_matrix)))
+        k = min(int(top_k), self._matrix.shape[0])
+        use_rerank = self.rerank > 0 and self._raw is not None
+        best_ids, best_scores = self._scan(queries, max(k, self.rerank) if use_rerank else k)
+        if use_rerank:
+            reranked_ids = np.full((queries.shape[0], k), -1, dtype=np.int64)
+            reranked_scores = np.full((queries.shape[0], k), -1.0, dtype=np.float32)
+            for j in range(queries.shape[0]):
+                shortlist = np.sort(best_ids[j])
+                exact = _unit_rows(self._raw[shortlist]) @ queries[j]
+                order = np.lexsort((shortlist, -exact))[:k]
+                reranked_ids[j] = shortlist[order]
+                reranked_scores[j] = exact[order]
+            best_ids, best_scores = reranked_ids, reranked_scores
+        degenerate = ~np.any(queries, axis=1)
+        best_ids[degenerate] = -1
+        best_scores[degenerate] = -1.0
+        return best_ids, best_scores
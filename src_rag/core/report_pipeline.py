@@ -19,6 +19,18 @@ class ReportPipeline:
     def run(self, question: str, top_k: Optional[int] = None) -> Dict[str, Any]:
         top_k_value = top_k or int(self.config["artifacts"]["retrieval_top_k"])
         retrieved = self.retriever.retrieve(question, top_k=top_k_value)
+        return self._answer(question, retrieved)
+
+    def run_many(self, questions: List[str], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Answer several questions, resolving all of their retrievals in one batched search."""
+        top_k_value = top_k or int(self.config["artifacts"]["retrieval_top_k"])
+        retrieved_lists = self.retriever.retrieve_many(questions, top_k=top_k_value)
+        return [
+            self._answer(question, retrieved)
+            for question, retrieved in zip(questions, retrieved_lists)
+        ]
+
+    def _answer(self, question: str, retrieved: List[Dict[str, Any]]) -> Dict[str, Any]:
         analysis = self.analyst.analyze(question, retrieved)
         final_text = self.writer.write(question, analysis, retrieved)
         citations: List[Dict[str, Any]] = [
@@ -1,9 +1,14 @@
+import hashlib
 import json
+import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 
 import numpy as np
+from numpy.lib.format import open_memmap
+
+from src.core.jsonl_store import JsonlWriter, iter_records
 
 
 def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
@@ -21,6 +26,94 @@ def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
     return chunks
 
 
+def chunk_hash(content: str, model: str, chunk_size: int, chunk_overlap: int) -> str:
+    """Content address of a chunk; any change to the text, model or chunking settings changes it."""
+    key = json.dumps([model, int(chunk_size), int(chunk_overlap), content], ensure_ascii=False)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _unit_rows(block: np.ndarray) -> np.ndarray:
+    # Sanitize vectors to avoid overflow/NaN propagation from noisy inputs.
+    b64 = np.nan_to_num(np.asarray(block, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+    b64 = np.clip(b64, -1e6, 1e6)
+
+    # Row-wise stable normalization; degenerate rows stay all-zero.
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        norms = np.linalg.norm(b64, axis=1)
+    valid_rows = np.isfinite(norms) & (norms > 1e-12)
+    unit = np.zeros_like(b64)
+    unit[valid_rows] = b64[valid_rows] / norms[valid_rows, None]
+    return unit.astype(np.float32)
+
+
+def _unit_query(query_vec: np.ndarray) -> Optional[np.ndarray]:
+    q = _unit_rows(np.asarray(query_vec).reshape(1, -1))[0]
+    if not np.any(q):
+        return None
+    return q
+
+
+# src/utils/helper.py vendors a copy for the multi-agent tree; change both together.
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest scores, best first, in O(N + k log k).
+
+    Candidates come from np.argpartition; only the k winners are sorted. Ties are broken
+    by the lower row index, including ties at the k-th boundary, so results are reproducible.
+    NaN scores rank as -inf.
+    """
+    scores = np.asarray(scores)
+    if scores.dtype.kind == "f" and np.isnan(scores).any():
+        scores = np.where(np.isnan(scores), -np.inf, scores)
+    n = scores.shape[0]
+    k = min(int(k), n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        kth_value = scores[np.argpartition(scores, n - k)[n - k :]].min()
+        above = np.flatnonzero(scores > kth_value)
+        ties = np.flatnonzero(scores == kth_value)[: k - above.size]
+        candidates = np.concatenate([above, ties])
+    else:
+        candidates = np.arange(n)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order]
+
+
+def normalize_rows(embeddings: np.ndarray, block_rows: int = 65536) -> np.ndarray:
+    """Sanitize and L2-normalize every row once, returning a contiguous float32 matrix."""
+    emb = np.asarray(embeddings)
+    unit = np.empty(emb.shape, dtype=np.float32)
+    for start in range(0, emb.shape[0], block_rows):
+        unit[start : start + block_rows] = _unit_rows(emb[start : start + block_rows])
+    return unit
+
+
+INDEX_MANIFEST = "index.json"
+# Files derived from embeddings.npy by IVF training or compression; stale once embeddings.npy is replaced.
+DERIVED_INDEX_FILES = ("ivf.npz", "codes.npy", "quant_params.npz", "quantization.json", INDEX_MANIFEST)
+
+
+def write_index_manifest(index_dir: Path, index_type: str, storage: str) -> None:
+    """Record which index type and vector storage the files in index_dir were built for."""
+    with (index_dir / INDEX_MANIFEST).open("w", encoding="utf-8") as f:
+        json.dump({"index_type": index_type, "storage": storage}, f, indent=2)
+
+
+def read_index_manifest(index_dir: Path) -> Optional[Dict[str, str]]:
+    """The manifest written by the last complete build, or None for indexes built before manifests."""
+    path = index_dir / INDEX_MANIFEST
+    if not path.exists():
+        return None
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def remove_derived_files(index_dir: Path) -> None:
+    for name in DERIVED_INDEX_FILES:
+        (index_dir / name).unlink(missing_ok=True)
+
+
 @dataclass
 class RetrievedChunk:
     content: str
@@ -30,45 +123,222 @@ class RetrievedChunk:
 
 
 class VectorIndex:
-    def __init__(self, index_dir: Path) -> None:
+    def __init__(self, index_dir: Path, mmap: bool = False, block_rows: int = 65536) -> None:
         self.index_dir = index_dir
-        self.meta_file = index_dir / "metadata.json"
+        # One JSON object per chunk and line; metadata.json is the legacy single-array format.
+        self.meta_file = index_dir / "metadata.jsonl"
+        self.legacy_meta_file = index_dir / "metadata.json"
         self.emb_file = index_dir / "embeddings.npy"
+        # With mmap=True the matrix stays on disk and is streamed in block_rows slices per query.
+        self.mmap = mmap
+        self.block_rows = max(1, int(block_rows))
+        # Resident state, populated by ensure_loaded() and refreshed only when the files change.
+        self._metadata: Optional[List[Dict]] = None
+        self._matrix: Optional[np.ndarray] = None
+        self._signature: Optional[tuple] = None
 
     def save(self, metadata: List[Dict], embeddings: np.ndarray) -> None:
-        self.index_dir.mkdir(parents=True, exist_ok=True)
-        with self.meta_file.open("w", encoding="utf-8") as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        self.write_metadata(metadata)
         np.save(self.emb_file, embeddings)
 
-    def load(self) -> tuple[List[Dict], np.ndarray]:
-        with self.meta_file.open("r", encoding="utf-8") as f:
-            metadata = json.load(f)
-        embeddings = np.load(self.emb_file)
+    def write_metadata(self, metadata: List[Dict]) -> None:
+        with JsonlWriter(self.meta_file) as writer:
+            writer.write_all(metadata)
+        self.legacy_meta_file.unlink(missing_ok=True)
+
+    def metadata_path(self) -> Path:
+        if not self.meta_file.exists() and self.legacy_meta_file.exists():
+            return self.legacy_meta_file
+        return self.meta_file
+
+    def iter_metadata(self) -> Iterator[Dict]:
+        return iter_records(self.meta_file, self.legacy_meta_file)
+
+    def load(self, mmap: bool = False) -> tuple[List[Dict], np.ndarray]:
+        metadata = list(self.iter_metadata())
+        embeddings = np.load(self.emb_file, mmap_mode="r" if mmap else None)
         return metadata, embeddings
 
-    @staticmethod
-    def search(query_vec: np.ndarray, embeddings: np.ndarray, top_k: int) -> np.ndarray:
-        # Sanitize vectors to avoid overflow/NaN propagation from noisy inputs.
-        emb64 = np.nan_to_num(np.asarray(embeddings, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
-        q64 = np.nan_to_num(np.asarray(query_vec, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
-        emb64 = np.clip(emb64, -1e6, 1e6)
-        q64 = np.clip(q64, -1e6, 1e6)
+    def reusable_vectors(self) -> tuple[Dict[str, int], Optional[np.ndarray]]:
+        """
+        Map chunk_hash -> row of the raw embeddings saved by a previous build, for incremental rebuilds.
 
-        # Row-wise stable normalization.
-        with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
-            emb_norm = np.linalg.norm(emb64, axis=1)
-            q_norm = np.linalg.norm(q64)
-        valid_rows = np.isfinite(emb_norm) & (emb_norm > 1e-12)
-        emb_unit = np.zeros_like(emb64)
-        emb_unit[valid_rows] = emb64[valid_rows] / emb_norm[valid_rows, None]
+        Returns ({}, None) when there is no previous build, the metadata predates chunk hashes, or only
+        compressed codes were kept. The embeddings are memory-mapped so only reused rows are read.
+        """
+        if not (self.metadata_path().exists() and self.emb_file.exists()):
+            return {}, None
+        embeddings = np.load(self.emb_file, mmap_mode="r")
+        rows: Dict[str, int] = {}
+        n_items = 0
+        for i, item in enumerate(self.iter_metadata()):
+            n_items += 1
+            if "chunk_hash" in item:
+                rows.setdefault(item["chunk_hash"], i)
+        if embeddings.shape[0] != n_items:
+            return {}, None
+        return rows, embeddings if rows else None
+
+    def _file_signature(self) -> tuple:
+        stats = (self.metadata_path().stat(), self.emb_file.stat())
+        return tuple((st.st_mtime_ns, st.st_size) for st in stats)
+
+    def ensure_loaded(self) -> tuple[List[Dict], np.ndarray]:
+        """
+        Return the resident (metadata, embeddings), reloading only if the files changed on disk.
+
+        In the default mode the embeddings are unit-normalized float32 held in RAM. In mmap mode
+        they are the raw on-disk matrix; rows are sanitized and normalized block by block at query time.
+        """
+        signature = self._file_signature()
+        if self._matrix is None or signature != self._signature:
+            metadata, embeddings = self.load(mmap=self.mmap)
+            self._metadata = metadata
+            self._matrix = embeddings if self.mmap else normalize_rows(embeddings)
+            self._signature = signature
+        return self._metadata, self._matrix
+
+    def query(self, query_vec: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Score a query against the resident index; returns (ids, scores) of the best rows."""
+        if self._matrix is None:
+            self.ensure_loaded()
+        q_unit = _unit_query(query_vec)
+        if q_unit is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if self.mmap:
+            ids, scores = self.query_batch(q_unit[None, :], top_k)
+            return ids[0], scores[0]
+        sims = self._matrix @ q_unit
+        sims = np.nan_to_num(sims, nan=-1.0, posinf=-1.0, neginf=-1.0)
+        ids = top_k_indices(sims, top_k)
+        return ids, sims[ids]
+
+    def query_batch(self, query_matrix: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Score a (Q, d) query matrix with blocked matrix-matrix products (one GEMM per row block).
+
+        Returns (ids, scores), both shaped (Q, k) with k = min(top_k, rows), best first per query.
+        Degenerate (all-zero or non-finite) queries get ids of -1 and scores of -1.
+        """
+        if self._matrix is None:
+            self.ensure_loaded()
+        queries = _unit_rows(np.atleast_2d(np.asarray(query_matrix)))
+        best_ids, best_scores = self._scan(queries, top_k)
+        degenerate = ~np.any(queries, axis=1)
+        best_ids[degenerate] = -1
+        best_scores[degenerate] = -1.0
+        return best_ids, best_scores
+
+    def _block_scores(self, start: int, stop: int, queries: np.ndarray) -> np.ndarray:
+        """(Q, stop - start) similarities of unit queries against rows [start, stop)."""
+        block = self._matrix[start:stop]
+        if self.mmap:
+            block = _unit_rows(block)
+        return queries @ block.T
 
-        if not np.isfinite(q_norm) or q_norm <= 1e-12:
-            sims = np.full((emb64.shape[0],), -1.0, dtype=np.float64)
-            return np.argsort(sims)[::-1][:top_k], sims
+    def _scan(self, queries: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        # Running per-query top-k over row blocks; ties resolve to the lower row id.
+        n_queries, n_rows = queries.shape[0], self._matrix.shape[0]
+        k = min(int(top_k), n_rows)
+        best_ids = np.full((n_queries, k), -1, dtype=np.int64)
+        best_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+        for start in range(0, n_rows, self.block_rows):
+            stop = min(start + self.block_rows, n_rows)
+            sims = self._block_scores(start, stop, queries)
+            sims = np.nan_to_num(sims, nan=-1.0, posinf=-1.0, neginf=-1.0)
+            for j in range(n_queries):
+                local = top_k_indices(sims[j], k)
+                cand_ids = np.concatenate([best_ids[j], local + start])
+                cand_scores = np.concatenate([best_scores[j], sims[j, local]])
+                keep = np.lexsort((cand_ids, -cand_scores))[:k]
+                best_ids[j] = cand_ids[keep]
+                best_scores[j] = cand_scores[keep]
+        return best_ids, best_scores
+
+    @staticmethod
+    def search(query_vec: np.ndarray, embeddings: np.ndarray, top_k: int) -> np.ndarray:
+        emb_unit = normalize_rows(embeddings)
+        q_unit = _unit_query(query_vec)
+        if q_unit is None:
+            sims = np.full((emb_unit.shape[0],), -1.0, dtype=np.float64)
+            return top_k_indices(sims, top_k), sims
 
-        q_unit = q64 / q_norm
         with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
             sims = emb_unit @ q_unit
         sims = np.nan_to_num(sims, nan=-1.0, posinf=-1.0, neginf=-1.0)
-        return np.argsort(sims)[::-1][:top_k], sims
+        return top_k_indices(sims, top_k), sims
+
+
+class IndexWriter:
+    """
+    Build metadata.jsonl/embeddings.npy from batches without holding the corpus in memory.
+
+    Vectors are appended to a raw float32 scratch file and copied block by block into an .npy memmap
+    on close(). Rows flagged as duplicates of an earlier row are filled in from that row, so a repeated
+    chunk is embedded once. Both files replace the previous index only when close() succeeds.
+    """
+
+    def __init__(self, index: VectorIndex) -> None:
+        self.index = index
+        index.index_dir.mkdir(parents=True, exist_ok=True)
+        self.raw_file = index.index_dir / "embeddings.raw.tmp"
+        self.npy_tmp = index.index_dir / "embeddings.npy.tmp"
+        self._meta = JsonlWriter(index.meta_file)
+        self._raw = self.raw_file.open("wb")
+        self._duplicates: List[tuple] = []
+        self.rows = 0
+        self.dim: Optional[int] = None
+
+    def add(self, items: List[Dict], vectors: Optional[np.ndarray], duplicate_of: Optional[List[int]] = None) -> None:
+        """
+        Append items; vectors holds one row per item whose duplicate_of entry is -1 (or every item).
+
+        duplicate_of[i] >= 0 marks items[i] as sharing the vector of that earlier output row.
+        """
+        duplicate_of = duplicate_of if duplicate_of is not None else [-1] * len(items)
+        if vectors is not None and len(vectors):
+            vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+        expected = sum(1 for d in duplicate_of if d < 0)
+        if expected and (vectors is None or vectors.shape[0] != expected):
+            raise ValueError(f"Expected {expected} vectors, got {0 if vectors is None else vectors.shape[0]}.")
+        zero = np.zeros(self.dim or 0, dtype=np.float32)
+        vec_pos = 0
+        for item, dup in zip(items, duplicate_of):
+            self._meta.write(item)
+            if dup >= 0:
+                # Placeholder row, overwritten from the original row in close().
+                self._duplicates.append((self.rows, dup))
+                self._raw.write(zero.tobytes())
+            else:
+                self._raw.write(vectors[vec_pos].tobytes())
+                vec_pos += 1
+            self.rows += 1
+
+    def close(self) -> int:
+        self._raw.close()
+        if self.rows == 0 or self.dim is None:
+            self.abort()
+            raise ValueError("No vectors were written to the index.")
+        raw = np.memmap(self.raw_file, dtype=np.float32, mode="r", shape=(self.rows, self.dim))
+        out = open_memmap(self.npy_tmp, mode="w+", dtype=np.float32, shape=(self.rows, self.dim))
+        block = self.index.block_rows
+        for start in range(0, self.rows, block):
+            out[start : start + block] = raw[start : start + block]
+        for row, src in self._duplicates:
+            out[row] = out[src]
+        out.flush()
+        del raw, out
+        self.raw_file.unlink()
+        os.replace(self.npy_tmp, self.index.emb_file)
+        self._meta.close()
+        self.index.legacy_meta_file.unlink(missing_ok=True)
+        return self.rows
+
+    def abort(self) -> None:
+        if not self._raw.closed:
+            self._raw.close()
+        self._meta.abort()
+        self.raw_file.unlink(missing_ok=True)
+        self.npy_tmp.unlink(missing_ok=True)
@@ -1,20 +1,28 @@
 import re
+import time
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from pypdf import PdfReader
 
+from src.core.jsonl_store import iter_records
+
+PAGES_FILE = "pages.jsonl"
+LEGACY_PAGES_FILE = "pages.json"
+
 
 def _sanitize_text(text: str) -> str:
     # Remove invalid Unicode surrogate code points that break JSON serialization.
     return re.sub(r"[\uD800-\uDFFF]", "", text)
 
 
-def extract_pdf_pages(pdf_path: Path) -> List[Dict]:
+def extract_pdf_pages(pdf_path: Path, first_page: int = 1, last_page: Optional[int] = None) -> List[Dict]:
+    """Extract pages first_page..last_page (1-based, inclusive; default: to the end) of a PDF."""
     reader = PdfReader(str(pdf_path))
+    last_page = len(reader.pages) if last_page is None else min(last_page, len(reader.pages))
     pages: List[Dict] = []
-    for idx, page in enumerate(reader.pages, start=1):
-        text = _sanitize_text(page.extract_text() or "")
+    for idx in range(first_page, last_page + 1):
+        text = _sanitize_text(reader.pages[idx - 1].extract_text() or "")
         pages.append(
             {
                 "source_file": pdf_path.name,
@@ -27,7 +35,27 @@ def extract_pdf_pages(pdf_path: Path) -> List[Dict]:
     return pages
 
 
+def count_pdf_pages(pdf_path: Path) -> int:
+    return len(PdfReader(str(pdf_path)).pages)
+
+
+def extract_pdf_task(pdf_path: Path, first_page: int, last_page: Optional[int]) -> Tuple[List[Dict], float]:
+    """Process-pool entry point: one page range of one file, plus the seconds it took."""
+    start = time.perf_counter()
+    pages = extract_pdf_pages(pdf_path, first_page=first_page, last_page=last_page)
+    return pages, time.perf_counter() - start
+
+
 def scan_pdf_files(source_dir: Path, recursive: bool = True) -> List[Path]:
     if recursive:
         return sorted(source_dir.rglob("*.pdf"))
     return sorted(source_dir.glob("*.pdf"))
+
+
+def iter_pages(parsed_dir: Path) -> Iterator[Dict]:
+    """Stream parsed pages from pages.jsonl (or a legacy pages.json) in ingestion order."""
+    jsonl_path = parsed_dir / PAGES_FILE
+    legacy_path = parsed_dir / LEGACY_PAGES_FILE
+    if not jsonl_path.exists() and not legacy_path.exists():
+        raise FileNotFoundError("Missing parsed pages. Run scripts/ingest_pdfs.py first.")
+    return iter_records(jsonl_path, legacy_path)
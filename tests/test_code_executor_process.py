@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+resource = pytest.importorskip("resource")
+
+from src.utils.code_executor_process import ExecutorWorkerPool, ProcessCodeExecutor
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ExecutorWorkerPool(size=1)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def make_executor(pool, tmp_path):
+    executors = []
+
+    def make(**budgets):
+        executor = ProcessCodeExecutor(str(tmp_path), pool=pool, **budgets)
+        executor.set_variable("base", 41)
+        executors.append(executor)
+        return executor
+
+    yield make
+    for executor in executors:
+        executor.close()
+
+
+def run(executor, code):
+    return asyncio.run(executor.execute(code))
+
+
+def assert_recovers(executor):
+    # A stopped worker is replaced transparently and injected variables are put back.
+    result = run(executor, "print(base + 1)")
+    assert not result["error"], result["stderr"]
+    assert result["stdout"].strip() == "42"
+    assert "budget_exceeded" not in result
+
+
+def test_within_budget(make_executor):
+    executor = make_executor(timeout=30, cpu_seconds=30, memory_mb=512)
+    result = run(executor, "x = base + 1\nprint(x)")
+    assert not result["error"], result["stderr"]
+    assert result["stdout"].strip() == "42"
+    assert "budget_exceeded" not in result
+
+
+def test_wall_time_budget(make_executor):
+    executor = make_executor(timeout=1)
+    result = run(executor, "while True:\n    pass")
+    assert result["error"]
+    assert result["budget_exceeded"] == "wall_time"
+    assert "wall-time budget" in result["stderr"]
+    assert_recovers(executor)
+
+
+def test_cpu_time_budget(make_executor):
+    executor = make_executor(timeout=60, cpu_seconds=1)
+    result = run(executor, "while True:\n    pass")
+    assert result["error"]
+    assert result["budget_exceeded"] == "cpu_time"
+    assert "CPU-time budget" in result["stderr"]
+    assert_recovers(executor)
+
+
+def test_memory_budget(make_executor):
+    executor = make_executor(timeout=60, memory_mb=64)
+    result = run(executor, "block = bytearray(1 << 30)")
+    assert result["error"]
+    assert result["budget_exceeded"] == "memory"
+    assert "memory budget" in result["stderr"]
+    # The worker survives a MemoryError, so the namespace is kept and smaller allocations still succeed.
+    result = run(executor, "print(base + 1)\nblock = bytearray(16 << 20)\nprint(len(block))")
+    assert not result["error"], result["stderr"]
+    assert result["stdout"].split() == ["42", str(16 << 20)]
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import numpy as np\nblock = np.ones((1 << 16, 1 << 16))",
+        "import pandas as pd\nleft = pd.DataFrame({'k': [0] * 20000})\njoined = left.merge(left, on='k')",
+    ],
+    ids=["numpy", "pandas"],
+)
+def test_memory_budget_library_allocation(make_executor, code):
+    # numpy and pandas raise _ArrayMemoryError, whose traceback does not end in a bare MemoryError
+    executor = make_executor(timeout=60, memory_mb=256)
+    result = run(executor, code)
+    assert result["error"]
+    assert result["budget_exceeded"] == "memory"
+    assert "out_of_memory" not in result
+    assert_recovers(executor)
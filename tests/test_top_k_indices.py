@@ -0,0 +1,35 @@
+import ast
+from pathlib import Path
+
+import numpy as np
+
+from src.utils.helper import top_k_indices
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_matches_stable_full_sort():
+    scores = np.random.default_rng(0).integers(0, 5, 1000).astype(np.float64)
+    expected = np.lexsort((np.arange(scores.size), -scores))[:7]
+    assert top_k_indices(scores, 7).tolist() == expected.tolist()
+
+
+def test_nan_scores_rank_last():
+    assert top_k_indices(np.array([1.0, np.nan, 2.0]), 2).tolist() == [2, 0]
+    assert top_k_indices(np.array([np.nan, 1.0, np.nan]), 3).tolist() == [1, 0, 2]
+    assert top_k_indices(np.full(4, np.nan), 2).tolist() == [0, 1]
+
+
+def test_k_out_of_range():
+    assert top_k_indices(np.array([3.0, 1.0]), 5).tolist() == [0, 1]
+    assert top_k_indices(np.array([3.0, 1.0]), 0).tolist() == []
+
+
+def test_vendored_copy_matches_rag_tree():
+    # helper.py vendors top_k_indices from the RAG tree, which is a separate `src` package
+    def source(path):
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        node = next(n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == "top_k_indices")
+        return ast.dump(node)
+
+    assert source(PROJECT_ROOT / "src" / "utils" / "helper.py") == source(PROJECT_ROOT / "src_rag" / "core" / "vector_index.py")